@@ -1,21 +1,16 @@
+import os
 import random
+import sys
 import time
 
+# shared helpers live at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sampling import weighted_choice
+
 TICK_DURATION = 0.1
 MAX_MEMORY = 5
 
 
-def weighted_choice(choices: dict):
-    total = sum(choices.values())
-    r = random.uniform(0, total)
-    upto = 0
-    for choice, weight in choices.items():
-        if upto + weight >= r:
-            return choice
-        upto += weight
-    return random.choice(list(choices.keys()))
-
-
 class NPC:
     def __init__(self, name):
         self.name = name
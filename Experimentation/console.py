@@ -0,0 +1,61 @@
+"""Buffered console output for the simulation.
+
+Everything a tick prints is collected in one list and written with a single
+write() + flush() at the end of the tick, instead of one print per NPC.
+
+Verbosity levels:
+    SUMMARY - one line per tick
+    EVENTS  - plus notable events (level-ups, duels, wars)
+    ALL     - plus routine actions, optionally sampled (1 in `sample_every`)
+"""
+import sys
+
+SUMMARY, EVENTS, ALL = 0, 1, 2
+LEVELS = {"summary": SUMMARY, "events": EVENTS, "all": ALL}
+
+
+class TickOutput:
+    def __init__(self, verbosity=ALL, sample_every=1, stream=None):
+        self.verbosity = verbosity
+        self.sample_every = max(1, sample_every)
+        self.stream = stream    # None: whatever sys.stdout is at flush time
+        self.tick = 0
+        self.lines = []
+        self.events = []        # notable events of the current tick
+        self.actions = 0
+        self._routine_seen = 0
+
+    def begin(self, tick):
+        self.tick = tick
+        self.lines = []
+        self.events = []
+        self.actions = 0
+        if self.verbosity > SUMMARY:
+            self.lines.append(f"\n=== WORLD TICK {tick} ===")
+
+    def action(self, message):
+        """Routine line (NPC actions, trades): shown at ALL, 1 in sample_every."""
+        self.actions += 1
+        if self.verbosity >= ALL:
+            self._routine_seen += 1
+            if self._routine_seen % self.sample_every == 0:
+                self.lines.append(message)
+
+    def detail(self, message):
+        """Line that belongs to a shown event (duel blows): ALL only, never sampled."""
+        if self.verbosity >= ALL:
+            self.lines.append(message)
+
+    def event(self, message):
+        self.events.append(message)
+        if self.verbosity >= EVENTS:
+            self.lines.append(message)
+
+    def flush(self):
+        if self.verbosity == SUMMARY:
+            self.lines.append(f"tick {self.tick}: {self.actions} actions, {len(self.events)} events")
+        if self.lines:
+            stream = self.stream or sys.stdout
+            stream.write("\n".join(self.lines) + "\n")
+            stream.flush()
+        self.lines = []
@@ -1,24 +1,42 @@
+import gc
 import random
-import time
+import sys
 import json 
+import os
+
+# shared helpers live at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sampling import weighted_choice
+from scheduler import TickScheduler
+import snapshot
+import population
+from social_graph import SocialGraph
+import lod
+from market import Market
+from observer import WorldObserver
+import console
 
 TICK_DURATION = 0.1
+MAX_CATCHUP_TICKS = 3   # ticks replayed back-to-back after an overrun
 MAX_MEMORY = 5
 
-
-def weighted_choice(choices: dict):
-    total = sum(choices.values())
-    r = random.uniform(0, total)
-    upto = 0
-    for choice, weight in choices.items():
-        if upto + weight >= r:
-            return choice
-        upto += weight
-    return random.choice(list(choices.keys()))
+# Personality traits and archetypes
+ARCHETYPES = {
+    "aggressive": {"aggression": 0.9, "social": 0.3, "greedy": 0.4, "cautious": 0.2},
+    "bully":      {"aggression": 0.8, "social": 0.4, "greedy": 0.2, "cautious": 0.3},
+    "merchant":   {"aggression": 0.2, "social": 0.6, "greedy": 0.9, "cautious": 0.6},
+    "loner":      {"aggression": 0.4, "social": 0.1, "greedy": 0.3, "cautious": 0.7},
+    "diplomat":   {"aggression": 0.1, "social": 0.9, "greedy": 0.2, "cautious": 0.5},
+    "strategist": {"aggression": 0.5, "social": 0.7, "greedy": 0.4, "cautious": 0.8},
+    "trickster":  {"aggression": 0.6, "social": 0.8, "greedy": 0.7, "cautious": 0.3},
+    "pacifist":   {"aggression": 0.0, "social": 0.9, "greedy": 0.3, "cautious": 0.6},
+    "hoarder":    {"aggression": 0.3, "social": 0.2, "greedy": 1.0, "cautious": 0.5},
+    "wanderer":   {"aggression": 0.2, "social": 0.4, "greedy": 0.2, "cautious": 0.7},
+}
 
 
 class NPC:
-    def __init__(self, name):
+    def __init__(self, name, archetype=None):
         self.name = name
         self.level = random.randint(1, 3)
         self.gold = random.randint(5, 20)
@@ -29,21 +47,8 @@ class NPC:
         self.attack = 5 + self.level * 2
         self.defense = 2 + self.level
 
-        # Personality traits and archetypes
-        archetypes = {
-            "aggressive": {"aggression": 0.9, "social": 0.3, "greedy": 0.4, "cautious": 0.2},
-            "bully":      {"aggression": 0.8, "social": 0.4, "greedy": 0.2, "cautious": 0.3},
-            "merchant":   {"aggression": 0.2, "social": 0.6, "greedy": 0.9, "cautious": 0.6},
-            "loner":      {"aggression": 0.4, "social": 0.1, "greedy": 0.3, "cautious": 0.7},
-            "diplomat":   {"aggression": 0.1, "social": 0.9, "greedy": 0.2, "cautious": 0.5},
-            "strategist": {"aggression": 0.5, "social": 0.7, "greedy": 0.4, "cautious": 0.8},
-            "trickster":  {"aggression": 0.6, "social": 0.8, "greedy": 0.7, "cautious": 0.3},
-            "pacifist":   {"aggression": 0.0, "social": 0.9, "greedy": 0.3, "cautious": 0.6},
-            "hoarder":    {"aggression": 0.3, "social": 0.2, "greedy": 1.0, "cautious": 0.5},
-            "wanderer":   {"aggression": 0.2, "social": 0.4, "greedy": 0.2, "cautious": 0.7},
-        }
-
-        atype_name, atype = random.choice(list(archetypes.items()))
+        atype_name = archetype or random.choice(list(ARCHETYPES))
+        atype = ARCHETYPES[atype_name]
         self.archetype_name = atype_name
         self.aggression = atype["aggression"]
         self.social = atype["social"]
@@ -51,6 +56,7 @@ class NPC:
         self.cautious = atype["cautious"]
 
         self.relationships = {}
+        self.inventory = {}  # good -> quantity, traded on the market
         self.memory = []
         self.guild = None 
 
@@ -120,6 +126,10 @@ class NPC:
                 self.attack += 2
                 self.defense += 1
                 return f"{self.name} levels up to {self.level}"
+            if random.random() < 0.4:
+                good = random.choice(list(world.market.books))
+                self.inventory[good] = self.inventory.get(good, 0) + 1
+                return f"{self.name} explores the world and gathers {good}"
             return f"{self.name} explores the world"
 
         elif goal == "socialize":
@@ -150,35 +160,33 @@ class NPC:
             return f"{self.name} talks with {other.name}"
 
         elif goal == "trade":
-            other = world.get_random_npc(exclude=self)
-            if not other:
-                return f"{self.name} didn't find anyone to trade with"
-
-            # How much to trade based on greed and current gold
-            amount = min(5, self.gold)
-            if amount <= 0:
+            market = world.market
+            goods_held = [g for g, qty in self.inventory.items() if qty > 0]
+
+            # Sell what we hold (greedy NPCs ask more, cautious ones undercut to be sure to sell)
+            if goods_held and (self.gold < 5 or random.random() < 0.5):
+                good = random.choice(goods_held)
+                qty = min(self.inventory[good], 1 + int(self.greedy * 3))
+                price = round(market.quote(good) * (1 + 0.5 * self.greedy - 0.3 * self.cautious))
+                if market.post(self, good, "sell", price, qty, world.tick):
+                    return f"{self.name} offers {qty} {good} for {max(1, price)} gold each"
+
+            # Buy (greedy NPCs lowball, reckless ones overpay)
+            good = random.choice(list(market.books))
+            price = max(1, round(market.quote(good) * (1 - 0.3 * self.greedy + 0.2 * (1 - self.cautious))))
+            qty = min(3, self.gold // price)
+            if qty <= 0:
                 return f"{self.name} wants to trade but has no gold"
-
-            # Transfer gold
-            self.gold -= amount
-            other.gold += amount
-
-            # Improve relations due to trade
-            self.change_relation(other.name, +5)
-            other.change_relation(self.name, +5)
-
-            # Remember the trade
-            self.remember(f"traded with {other.name}")
-            other.remember(f"traded with {self.name}")
-
-            return f"{self.name} trades with {other.name} and gives {amount} gold"
+            market.post(self, good, "buy", price, qty, world.tick)
+            return f"{self.name} bids for {qty} {good} at {price} gold each"
 
         elif goal == "guild":
             if not self.is_alive():
                 return f"{self.name} is dead and cannot act with guild"
 
             if self.guild:
-                other = world.get_random_npc(exclude=self)
+                # recruit among friends first, anyone when no friend is available
+                other = world.find_recruit(self) or world.get_random_npc(exclude=self)
                 if other and not other.guild:
                     self.guild.add_member(other)
                     return f"{self.name} invites {other.name} to guild {self.guild.name}"
@@ -236,7 +244,6 @@ class Combat:
                 f"(HP {defender.hp}/{defender.max_hp})"
             )
             turn += 1
-            time.sleep(0.2)
 
         winner = a if a.is_alive() else b
         loser = b if winner == a else a
@@ -255,13 +262,53 @@ class World:
         self.guilds = []
         self.history = []  
         self.event_log = [] 
+        self.npc_index = {}  # name -> NPC
+        self.social_graph = SocialGraph()
+        self.lod = None  # LevelOfDetail once enable_lod() is called
+        self.market = Market()
+        self.out = console.TickOutput()  # buffered, written once per tick
 
     def add_npc(self, npc):
         self.npcs.append(npc)
+        self.npc_index[npc.name] = npc
 
     def get_random_npc(self, exclude=None):
-        candidates = [n for n in self.npcs if n != exclude and n.is_alive()]
-        return random.choice(candidates) if candidates else None
+        # a few blind picks are almost always enough; scan only when most NPCs are dead
+        for _ in range(8):
+            npc = random.choice(self.npcs) if self.npcs else None
+            if npc is not None and npc != exclude and npc.is_alive():
+                break
+        else:
+            candidates = [n for n in self.npcs if n != exclude and n.is_alive()]
+            npc = random.choice(candidates) if candidates else None
+
+        if self.lod and npc and exclude:
+            self.lod.on_interaction(exclude, npc, self.tick)
+        return npc
+
+    def enable_lod(self, observed=(), coarse_step=lod.COARSE_STEP):
+        """Run full NPC logic only for `observed` names (and NPCs they pull in)."""
+        drift = lod.calibrate(lambda archetype: NPC("calibration", archetype), ARCHETYPES)
+        self.lod = lod.LevelOfDetail(drift, observed, coarse_step=coarse_step)
+
+    def find_recruit(self, npc):
+        """Guildless, alive NPC from npc's positive-affinity community (or None)."""
+        def available(name):
+            other = self.npc_index.get(name)
+            return other is not None and other.is_alive() and not other.guild
+
+        name = self.social_graph.pick_peer(npc.name, available)
+        return self.npc_index[name] if name else None
+
+    def settle_trades(self):
+        for fill in self.market.clear(self.tick):
+            buyer, seller = fill.buyer, fill.seller
+            # Improve relations due to trade
+            buyer.change_relation(seller.name, +5)
+            seller.change_relation(buyer.name, +5)
+            buyer.remember(f"traded with {seller.name}")
+            seller.remember(f"traded with {buyer.name}")
+            self.out.action(f"{buyer.name} buys {fill.qty} {fill.good} from {seller.name} at {fill.price} gold")
 
     def check_conflicts(self):
         for npc in self.npcs:
@@ -276,32 +323,50 @@ class World:
         return None
 
     def get_npc_by_name(self, name):
-        for npc in self.npcs:
-            if npc.name == name:
-                return npc
-        return None
+        return self.npc_index.get(name)
 
-    def world_tick(self):
+    def world_tick(self, optional_work=True):
         self.tick += 1
-        print(f"\n=== WORLD TICK {self.tick} ===")
+        self.out.begin(self.tick)
 
         conflict = self.check_conflicts()
         if conflict:
             a, b = conflict
-            print("\n".join(Combat.duel(a, b)))
+            if self.lod:
+                self.lod.promote(a, self.tick)
+                self.lod.promote(b, self.tick)
+            self.report_duel(Combat.duel(a, b))
             a.energy -= 20
             b.energy -= 20
+            self.out.flush()
             return
 
-        self.npcs.sort(key=lambda n: n.name)
-        for npc in self.npcs:
-            print(npc.act(self))
+        if self.lod:
+            active = self.lod.active_npcs(self)
+        else:
+            self.npcs.sort(key=lambda n: n.name)
+            active = self.npcs
+        for npc in active:
+            level = npc.level
+            message = npc.act(self)
+            if npc.level > level:
+                self.out.event(message)
+            else:
+                self.out.action(message)
+        if self.lod:
+            self.lod.step(self)
+
+        # match every order posted this tick in one batch
+        self.settle_trades()
 
         # check for guild wars
         self.check_guild_wars()
 
-        self.save_state(f"world_state_tick.json")
-        self.save_log()  # update text log
+        # persistence and analytics are optional work: skipped while the scheduler is behind
+        if optional_work:
+            self.social_graph.update(self)
+            self.save_state(f"world_state_tick.json")
+            self.save_log()  # update text log
 
         # conduct battles between warring guilds
         for guild in self.guilds:
@@ -316,17 +381,38 @@ class World:
                 # choose random fighter and opponent
                 member = random.choice(alive_members)
                 opponent = random.choice(alive_opponents)
+                if self.lod:
+                    self.lod.promote(member, self.tick)
+                    self.lod.promote(opponent, self.tick)
 
-                print("\n".join(Combat.duel(member, opponent)))
+                self.report_duel(Combat.duel(member, opponent))
                 member.energy -= 20
                 opponent.energy -= 20
 
                 if not any(m.is_alive() for m in enemy_guild.members):
                     guild.enemies.remove(enemy_guild)
                     enemy_guild.enemies.remove(guild)
-                    print(f"🏳️ Guild {guild.name} defeats guild {enemy_guild.name} and the war ends!")
+                    self.out.event(f"🏳️ Guild {guild.name} defeats guild {enemy_guild.name} and the war ends!")
 
-    def save_state(self, filename="world_state.json"):
+        self.out.flush()
+
+    def report_duel(self, log):
+        # opening and result are events, the blows in between are details
+        self.out.event(log[0])
+        for line in log[1:-1]:
+            self.out.detail(line)
+        self.out.event(log[-1])
+
+    def save_state(self, filename="world_state.json", format="json", compress=False):
+        """Save the world as indented JSON or as a compact columnar snapshot (format="columnar")."""
+        if format == "columnar":
+            snapshot.save_columnar(self, filename, compress=compress)
+            return
+
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.state_dict(), f, indent=4, ensure_ascii=False)
+
+    def state_dict(self):
         data = {
             "tick": self.tick,
             "npcs": [],
@@ -343,6 +429,7 @@ class World:
                 "energy": npc.energy,
                 "guild": npc.guild.name if npc.guild else None,
                 "relationships": npc.relationships,
+                "inventory": npc.inventory,
                 "archetype": npc.archetype_name,
                 "traits": {  # <-- new fields
                     "aggression": npc.aggression,
@@ -359,31 +446,91 @@ class World:
                 "enemies": [e.name for e in guild.enemies]
             })
 
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        # open orders hold escrowed gold and goods; without them a reload loses both
+        data["market"] = self.market.state()
+        return data
+
+    @classmethod
+    def load_state(cls, filename):
+        """Rebuild a world from a JSON or columnar snapshot (detected from the file)."""
+        if snapshot.is_columnar(filename):
+            with snapshot.load_columnar(filename) as snap:
+                data = snap.to_dict()
+        else:
+            with open(filename, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+        world = cls()
+        world.tick = data["tick"]
+        for record in data["npcs"]:
+            npc = NPC(record["name"], record["archetype"])
+            for key in ("hp", "max_hp", "gold", "level", "energy"):
+                setattr(npc, key, record[key])
+            # attack/defense are not saved: both grow with every level-up
+            npc.attack = 5 + npc.level * 2
+            npc.defense = 2 + npc.level
+            npc.archetype_name = record["archetype"]
+            for trait, value in record["traits"].items():
+                setattr(npc, trait, value)
+            npc.relationships = dict(record["relationships"])
+            npc.inventory = dict(record.get("inventory", {}))
+            world.add_npc(npc)
+
+        for record in data["guilds"]:
+            guild = Guild(record["name"])
+            for name in record["members"]:
+                member = world.get_npc_by_name(name)
+                if member:
+                    guild.add_member(member)
+            world.guilds.append(guild)
+        guilds = {g.name: g for g in world.guilds}
+        for record in data["guilds"]:
+            for enemy in record["enemies"]:
+                guilds[record["name"]].declare_war(guilds[enemy])
+        if data.get("market"):
+            world.market.restore(data["market"], world.npc_index)
+        return world
 
     def save_log(self, filename="world_log.txt"):
             with open(filename, "w", encoding="utf-8") as f:
                 f.write("\n".join(self.event_log))
 
 
-    def run(self):
+    def run(self, max_ticks=None, observer=None):
+        """Tick at a fixed rate; an optional WorldObserver streams every tick to subscribers."""
         print("World started...")
-        while True:
-            self.world_tick()
-            time.sleep(TICK_DURATION)
+
+        def tick(optional_work):
+            self.world_tick(optional_work)
+            if observer:
+                observer.publish(self)
+
+        self.scheduler = TickScheduler(TICK_DURATION, max_catchup=MAX_CATCHUP_TICKS)
+        if observer:
+            observer.start()
+        try:
+            self.scheduler.run(tick, max_ticks)
+        finally:
+            if observer:
+                observer.stop()
+            print(self.scheduler.summary())
     
     def check_guild_wars(self):
         """Check if there is reason for war between guilds"""
         for guild in self.guilds:
             for member in guild.members:
-                for other in self.npcs:
-                    if other.guild and other.guild != guild:
-                        relation = member.relationships.get(other.name, 0)
-                        if relation <= -40 and other.guild not in guild.enemies:
+                for other_name, relation in member.relationships.items():
+                    if relation > -40:
+                        continue
+                    other = self.npc_index.get(other_name)
+                    if other and other.guild and other.guild != guild:
+                        # a feud inside one circle of friends is not worth a war
+                        if self.social_graph.same_community(member.name, other_name):
+                            continue
+                        if other.guild not in guild.enemies:
                             # start war
                             guild.declare_war(other.guild)
-                            print(f"🔥 Guild {guild.name} declares war on guild {other.guild.name}")
+                            self.out.event(f"🔥 Guild {guild.name} declares war on guild {other.guild.name}")
 
 
 class Guild:
@@ -415,8 +562,38 @@ class Guild:
         return f"Guild {self.name} ({len(self.members)} members)"
 
 
-if __name__ == "__main__":
+def create_world(count, archetype_weights=None, relation_degree=None, names=None):
+    """Bootstrap a world of `count` NPCs.
+
+    O(N * degree) with a relation_degree, or for more than
+    population.DENSE_RELATIONS_LIMIT NPCs; smaller worlds default to a
+    relation for every pair, which is O(N^2).
+
+    archetype_weights: {archetype: weight}, uniform over ARCHETYPES by default.
+    relation_degree: starting acquaintances per NPC; None means every pair
+    for small worlds (see population.DENSE_RELATIONS_LIMIT).
+    names: optional explicit names (at least `count`), synthetic unique names otherwise.
+    """
     world = World()
+    if names is not None and len(names) < count:
+        raise ValueError(f"{len(names)} names given for {count} NPCs")
+    names = names or population.generate_names(count)
+    archetypes = population.sample_archetypes(count, archetype_weights or dict.fromkeys(ARCHETYPES, 1))
+
+    # millions of new dicts would otherwise trigger repeated full GC passes
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for name, archetype in zip(names, archetypes):
+            world.add_npc(NPC(name, archetype))
+        population.seed_relationships(world.npcs, relation_degree)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return world
+
+
+if __name__ == "__main__":
 
     names = [
         "Kai", "Lyn", "Aron", "Mira", "Tess",
@@ -433,13 +610,22 @@ if __name__ == "__main__":
         "Briar", "Calla", "Dorian", "Eira", "Fenris"
     ]
 
-    for name in names:
-        world.add_npc(NPC(name))
-        for npc in world.npcs:
-            for other in world.npcs:
-                if other != npc:
-                    # some randomness so conflicts can arise immediately
-                    npc.relationships[other.name] = random.randint(-5, 5)
-
-
-    world.run()
+    # some randomness in starting relations so conflicts can arise immediately
+    world = create_world(len(names), names=names)
+
+    # python exper.py --observe [port]  -> stream the world to observer.py clients
+    observer = None
+    if "--observe" in sys.argv:
+        args = sys.argv[sys.argv.index("--observe") + 1:]
+        observer = WorldObserver(port=int(args[0])) if args and args[0].isdigit() else WorldObserver()
+
+    # python exper.py --verbosity summary|events|all --sample K  -> how much of each tick is printed
+    if "--verbosity" in sys.argv:
+        world.out.verbosity = console.LEVELS[sys.argv[sys.argv.index("--verbosity") + 1]]
+    if "--sample" in sys.argv:
+        sample_every = int(sys.argv[sys.argv.index("--sample") + 1])
+        if sample_every < 1:
+            sys.exit("usage: --sample K needs K >= 1 (show 1 in K routine lines)")
+        world.out.sample_every = sample_every
+
+    world.run(observer=observer)
@@ -0,0 +1,202 @@
+"""Level-of-detail simulation: full NPC.act only for NPCs someone is watching.
+
+Observed NPCs (and NPCs promoted because they interacted with one, or were
+pulled into a fight) run the normal per-tick logic. Everyone else is advanced
+every `coarse_step` ticks, one bucket of the population per tick, with
+aggregated statistical updates: level-ups, gathered goods and wages at the
+archetype's calibrated rates, energy relaxing toward the archetype's typical
+value, and a sampled number of social/trade encounters that change
+relations. Gold only ever changes by a delta (wages add to it, like work does
+at full fidelity), so whatever an NPC earned or got from the market stays
+with it. A coarse trade is a swap of one good for gold at the market's last
+price, so it moves wealth around without creating or destroying any.
+
+Run this file to compare throughput against full fidelity.
+"""
+import random
+
+COARSE_STEP = 10        # ticks between two coarse updates of the same NPC
+PROMOTE_TICKS = 3       # how long an NPC stays at full fidelity after an interaction
+CALIBRATION_TICKS = 3000
+RELAX_TICKS = 50        # energy reaches its typical value over about this many ticks
+
+
+def _stochastic_round(x):
+    n = int(x)
+    return n + (random.random() < x - n)
+
+
+def _partner(world, npc):
+    """A random living NPC other than `npc` for a coarse encounter, or None.
+
+    Unlike World.get_random_npc this is one pick and never promotes anyone:
+    a sampled encounter is not an interaction anybody watches.
+    """
+    other = random.choice(world.npcs)
+    return other if other is not npc and other.is_alive() else None
+
+
+def calibrate(npc_factory, archetypes, ticks=CALIBRATION_TICKS, burn_in=200):
+    """Per-archetype statistics from an NPC choosing goals on its own.
+
+    Only the effects that do not need a world are replayed (rest, work,
+    explore); encounters and trades are just counted, a trade being a swap
+    at market price that leaves the NPC's wealth unchanged.
+    """
+    drift = {}
+    for name in archetypes:
+        npc = npc_factory(name)
+        goals = dict.fromkeys(("rest", "work", "explore", "socialize", "trade", "guild"), 0)
+        energy_sum = 0
+        for t in range(ticks + burn_in):
+            goal = npc.choose_goal()
+            if goal == "rest":
+                npc.energy += 30
+            elif goal == "work":
+                npc.gold += 5.5   # mean of randint(3, 8)
+                npc.energy -= 20
+            elif goal == "explore":
+                npc.energy -= 25
+            if t >= burn_in:
+                goals[goal] += 1
+                energy_sum += npc.energy
+
+        drift[name] = {
+            "energy": energy_sum / ticks,
+            "gold_drift": goals["work"] / ticks * 5.5,
+            "level": goals["explore"] / ticks * 0.3,
+            "gather": goals["explore"] / ticks * 0.7 * 0.4,   # no level-up, then a find
+            "heal": goals["rest"] / ticks * 10,
+            "socialize": goals["socialize"] / ticks,
+            "trade": goals["trade"] / ticks,
+        }
+    return drift
+
+
+class LevelOfDetail:
+    def __init__(self, drift, observed=(), coarse_step=COARSE_STEP, promote_ticks=PROMOTE_TICKS):
+        self.drift = drift
+        self.observed = set(observed)
+        self.coarse_step = coarse_step
+        self.promote_ticks = promote_ticks
+        self.promoted = {}   # name -> tick the promotion expires
+        self.coarse_updates = 0
+        self.promotions = 0
+
+    def is_full(self, npc):
+        return npc.name in self.observed or npc.name in self.promoted
+
+    def observe(self, *names):
+        self.observed.update(names)
+
+    def promote(self, npc, tick):
+        if npc.name not in self.observed:
+            if npc.name not in self.promoted:
+                self.promotions += 1
+            self.promoted[npc.name] = tick + self.promote_ticks
+
+    def on_interaction(self, npc, other, tick):
+        # only contact with an observed NPC pulls someone up, so promotions do not cascade
+        if npc.name in self.observed:
+            self.promote(other, tick)
+        elif other.name in self.observed:
+            self.promote(npc, tick)
+
+    def active_npcs(self, world):
+        names = sorted(self.observed | self.promoted.keys())
+        return [npc for npc in map(world.get_npc_by_name, names) if npc is not None]
+
+    def step(self, world):
+        """Expire promotions and advance this tick's bucket of coarse NPCs."""
+        tick = world.tick
+        for name in [n for n, until in self.promoted.items() if until <= tick]:
+            del self.promoted[name]
+
+        for npc in world.npcs[tick % self.coarse_step::self.coarse_step]:
+            if npc.is_alive() and not self.is_full(npc):
+                self._advance(npc, world)
+
+    def _advance(self, npc, world):
+        steps = self.coarse_step
+        d = self.drift[npc.archetype_name]
+        self.coarse_updates += 1
+
+        for _ in range(_stochastic_round(d["level"] * steps)):
+            npc.level += 1
+            npc.max_hp += 10
+            npc.attack += 2
+            npc.defense += 1
+
+        relax = min(1.0, steps / RELAX_TICKS)
+        npc.energy = round(npc.energy + (d["energy"] - npc.energy) * relax)
+        npc.gold += _stochastic_round(d["gold_drift"] * steps)
+        npc.hp = min(npc.max_hp, npc.hp + round(d["heal"] * steps))
+        goods = list(world.market.books)
+        for _ in range(_stochastic_round(d["gather"] * steps)):
+            good = random.choice(goods)
+            npc.inventory[good] = npc.inventory.get(good, 0) + 1
+
+        for _ in range(_stochastic_round(d["socialize"] * steps)):
+            other = _partner(world, npc)
+            if not other:
+                continue
+            roll = random.random()
+            if roll < npc.aggression * 0.4:
+                npc.change_relation(other.name, -15)
+                other.change_relation(npc.name, -5)
+            elif roll < npc.social:
+                npc.change_relation(other.name, +10)
+                other.change_relation(npc.name, +10)
+
+        for _ in range(_stochastic_round(d["trade"] * steps)):
+            other = _partner(world, npc)
+            if not other:
+                continue
+            good = random.choice(goods)
+            price = world.market.quote(good)
+            buyer, seller = (npc, other) if random.random() < 0.5 else (other, npc)
+            if seller.inventory.get(good, 0) <= 0 or buyer.gold < price:
+                continue
+            seller.inventory[good] -= 1
+            buyer.inventory[good] = buyer.inventory.get(good, 0) + 1
+            buyer.gold -= price
+            seller.gold += price
+            npc.change_relation(other.name, +5)
+            other.change_relation(npc.name, +5)
+
+
+def benchmark(count=2000, ticks=30, observed=50, relation_degree=8):
+    """Ticks per second at full fidelity vs level of detail on the same world size.
+
+    For level of detail it also prints how many NPCs ran at full fidelity per
+    tick on average (observed plus promoted), which is what the gain depends on.
+    """
+    import contextlib
+    import io
+    import time
+
+    import exper
+
+    results = {}
+    for mode in ("full", "lod"):
+        random.seed(1)
+        world = exper.create_world(count, relation_degree=relation_degree)
+        if mode == "lod":
+            world.enable_lod(observed=[npc.name for npc in world.npcs[:observed]])
+        elapsed = 0.0
+        full = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(ticks):
+                start = time.perf_counter()
+                world.world_tick(optional_work=False)
+                elapsed += time.perf_counter() - start
+                full += len(world.lod.active_npcs(world)) if world.lod else count
+        results[mode] = ticks / elapsed
+        print(f"{mode:>4}: {count} NPCs, {ticks} ticks in {elapsed:.2f} s -> {results[mode]:.1f} ticks/s, "
+              f"{full / ticks:.0f} at full fidelity per tick")
+    print(f"speedup: x{results['lod'] / results['full']:.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
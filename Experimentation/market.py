@@ -0,0 +1,236 @@
+"""Order-book market for NPC trading.
+
+NPCs post limit orders during a tick; Market.clear() runs at the end of the
+tick and matches the whole batch in arrival order against the resting book
+with price-time priority (best price first, then oldest). Trades execute at
+the resting order's price. Gold for bids and goods for asks are escrowed when
+the order is posted and refunded when it expires, so nobody can overspend.
+
+Run this file for a matching throughput benchmark.
+"""
+import heapq
+import itertools
+import random
+
+GOODS = {"herbs": 4, "ore": 7, "leather": 10}   # good -> starting reference price
+ORDER_TTL = 5   # ticks an unfilled order rests in the book
+
+
+class Order:
+    __slots__ = ("owner", "good", "side", "price", "qty", "seq", "expires")
+
+    def __init__(self, owner, good, side, price, qty, seq, expires):
+        self.owner = owner
+        self.good = good
+        self.side = side    # "buy" or "sell"
+        self.price = price
+        self.qty = qty
+        self.seq = seq
+        self.expires = expires
+
+
+class Fill:
+    __slots__ = ("buyer", "seller", "good", "price", "qty")
+
+    def __init__(self, buyer, seller, good, price, qty):
+        self.buyer = buyer
+        self.seller = seller
+        self.good = good
+        self.price = price
+        self.qty = qty
+
+
+class OrderBook:
+    """Bids and asks of one good, as heaps ordered by price then arrival."""
+
+    def __init__(self):
+        self.bids = []   # (-price, seq, order)
+        self.asks = []   # (price, seq, order)
+
+    def match(self, order, fills, cancelled):
+        """Match an incoming order against the book; rest any remainder.
+
+        A resting order from the same owner is cancelled instead of traded
+        (self-trade prevention) and handed back through `cancelled`.
+        """
+        if order.side == "buy":
+            book, crosses = self.asks, lambda best: best.price <= order.price
+        else:
+            book, crosses = self.bids, lambda best: best.price >= order.price
+
+        while order.qty and book:
+            best = book[0][2]
+            if best.qty == 0:          # cancelled/expired, dropped lazily
+                heapq.heappop(book)
+                continue
+            if not crosses(best):
+                break
+            if best.owner is order.owner:
+                heapq.heappop(book)
+                cancelled.append(best)
+                continue
+            qty = min(order.qty, best.qty)
+            order.qty -= qty
+            best.qty -= qty
+            buy, sell = (order, best) if order.side == "buy" else (best, order)
+            fills.append((buy, sell, best.price, qty))
+            if best.qty == 0:
+                heapq.heappop(book)
+
+        if order.qty:
+            if order.side == "buy":
+                heapq.heappush(self.bids, (-order.price, order.seq, order))
+            else:
+                heapq.heappush(self.asks, (order.price, order.seq, order))
+
+    def best_bid(self):
+        while self.bids and self.bids[0][2].qty == 0:
+            heapq.heappop(self.bids)
+        return self.bids[0][2].price if self.bids else None
+
+    def best_ask(self):
+        while self.asks and self.asks[0][2].qty == 0:
+            heapq.heappop(self.asks)
+        return self.asks[0][2].price if self.asks else None
+
+
+class Market:
+    def __init__(self, goods=GOODS, ttl=ORDER_TTL):
+        self.books = {good: OrderBook() for good in goods}
+        self.last_price = dict(goods)
+        self.ttl = ttl
+        self.pending = []    # orders posted this tick, matched by clear()
+        self.resting = []    # orders left in the books, checked for expiry
+        self._seq = itertools.count()
+        self.matched_orders = 0
+
+    def quote(self, good):
+        return self.last_price[good]
+
+    def post(self, owner, good, side, price, qty, tick):
+        """Escrow and queue an order; returns False if the owner cannot cover it."""
+        price = max(1, int(price))
+        if qty <= 0:
+            return False
+        if side == "buy":
+            if owner.gold < price * qty:
+                return False
+            owner.gold -= price * qty
+        else:
+            if owner.inventory.get(good, 0) < qty:
+                return False
+            owner.inventory[good] -= qty
+        self.pending.append(Order(owner, good, side, price, qty, next(self._seq), tick + self.ttl))
+        return True
+
+    def clear(self, tick):
+        """Match this tick's orders, settle fills, expire old orders. Returns [Fill]."""
+        raw = []
+        cancelled = []
+        for order in self.pending:
+            self.books[order.good].match(order, raw, cancelled)
+            if order.qty:
+                self.resting.append(order)
+        self.pending = []
+        for order in cancelled:
+            self._refund(order)
+            order.qty = 0
+
+        fills = []
+        for buy, sell, price, qty in raw:
+            buyer, seller = buy.owner, sell.owner
+            buyer.inventory[buy.good] = buyer.inventory.get(buy.good, 0) + qty
+            buyer.gold += (buy.price - price) * qty   # refund price improvement
+            seller.gold += price * qty
+            self.last_price[buy.good] = price
+            fills.append(Fill(buyer, seller, buy.good, price, qty))
+        self.matched_orders += len(raw)
+
+        still_resting = []
+        for order in self.resting:
+            if order.qty and order.expires <= tick:
+                self._refund(order)
+                order.qty = 0
+            elif order.qty:
+                still_resting.append(order)
+        self.resting = still_resting
+        return fills
+
+    def state(self):
+        """Last prices and open orders (escrow included), in a JSON-friendly shape."""
+        orders = [o for o in self.pending + self.resting if o.qty]
+        orders.sort(key=lambda o: o.seq)
+        return {
+            "last_price": dict(self.last_price),
+            "orders": [{"owner": o.owner.name, "good": o.good, "side": o.side, "price": o.price,
+                        "qty": o.qty, "expires": o.expires, "pending": o in self.pending} for o in orders],
+        }
+
+    def restore(self, state, owners):
+        """Put back a state() snapshot; owners maps names to NPCs. Escrow is not taken again."""
+        self.last_price.update(state.get("last_price", {}))
+        for record in state.get("orders", []):
+            owner = owners.get(record["owner"])
+            if owner is None or record["good"] not in self.books:
+                continue
+            order = Order(owner, record["good"], record["side"], record["price"], record["qty"],
+                          next(self._seq), record["expires"])
+            if record.get("pending"):
+                self.pending.append(order)
+                continue
+            book = self.books[order.good]
+            if order.side == "buy":
+                heapq.heappush(book.bids, (-order.price, order.seq, order))
+            else:
+                heapq.heappush(book.asks, (order.price, order.seq, order))
+            self.resting.append(order)
+
+    def escrow(self):
+        """(gold, {good: qty}) currently held by open orders."""
+        gold, goods = 0, {}
+        for order in self.pending + self.resting:
+            if order.side == "buy":
+                gold += order.price * order.qty
+            elif order.qty:
+                goods[order.good] = goods.get(order.good, 0) + order.qty
+        return gold, goods
+
+    def _refund(self, order):
+        if order.side == "buy":
+            order.owner.gold += order.price * order.qty
+        else:
+            order.owner.inventory[order.good] = order.owner.inventory.get(order.good, 0) + order.qty
+
+
+def benchmark(orders=200000, traders=1000, batch=5000):
+    """Orders matched per second with random traders around the reference prices."""
+    import time
+
+    class Trader:
+        def __init__(self):
+            self.gold = 10 ** 9
+            self.inventory = {good: 10 ** 6 for good in GOODS}
+
+    random.seed(1)
+    market = Market()
+    people = [Trader() for _ in range(traders)]
+    goods = list(GOODS)
+    matched = 0
+    elapsed = 0.0
+    tick = 0
+    for start in range(0, orders, batch):
+        for _ in range(min(batch, orders - start)):
+            good = random.choice(goods)
+            side = random.choice(("buy", "sell"))
+            price = GOODS[good] + random.randint(-2, 2)
+            market.post(random.choice(people), good, side, price, random.randint(1, 5), tick)
+        t0 = time.perf_counter()
+        matched += len(market.clear(tick))
+        elapsed += time.perf_counter() - t0
+        tick += 1
+    print(f"{orders} orders in {tick} batches: {matched} fills, clearing took {elapsed:.2f} s")
+    print(f"throughput: {orders / elapsed:,.0f} orders/s, {matched / elapsed:,.0f} fills/s")
+
+
+if __name__ == "__main__":
+    benchmark()
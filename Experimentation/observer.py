@@ -0,0 +1,184 @@
+"""Live world streaming over a local socket.
+
+WorldObserver runs an asyncio server (TCP on localhost, or a Unix socket) in a
+background thread next to World.run. After every tick the simulation calls
+publish(): it computes which NPCs changed, serializes the delta once, and hands
+the bytes to the event loop with call_soon_threadsafe, so the simulation never
+waits for a subscriber.
+
+Protocol: newline-delimited JSON. The server sends {"type": "delta", ...}
+every tick; a client may send the line "snapshot" to get the full state
+({"type": "snapshot", ...}) after the next tick. Each client has a bounded
+queue: a client that falls behind loses its backlog and is sent a fresh
+snapshot instead, so one slow reader cannot grow memory or delay others.
+
+Run this file to watch a running world: python observer.py [port | unix-path]
+"""
+import asyncio
+import json
+import sys
+import threading
+
+QUEUE_SIZE = 64   # messages buffered per client before it is resynced
+
+
+class _Client:
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        self.wants_snapshot = True   # new clients start from a full snapshot
+        self.dropped = 0
+        self.sender = None
+        self.handler = None
+
+
+class WorldObserver:
+    def __init__(self, host="127.0.0.1", port=8765, path=None, queue_size=QUEUE_SIZE):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.queue_size = queue_size
+        self.clients = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._started = threading.Event()
+        self._snapshot_requested = False
+        self._last = {}   # npc name -> last published state
+
+    # ---- simulation side ----
+    def start(self):
+        self._thread = threading.Thread(target=self._run_loop, name="world-observer", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        where = self.path or f"{self.host}:{self.port}"
+        print(f"Observer listening on {where}")
+
+    def stop(self):
+        if self._loop:
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=2)
+            except Exception:
+                pass
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2)
+
+    def publish(self, world):
+        """Called by the simulation after each tick; never blocks on clients."""
+        if self._loop is None:
+            return
+        changed = {}
+        for npc in world.npcs:
+            state = (npc.hp, npc.max_hp, npc.gold, npc.level, npc.energy, npc.guild.name if npc.guild else None)
+            if self._last.get(npc.name) != state:
+                self._last[npc.name] = state
+                changed[npc.name] = dict(zip(("hp", "max_hp", "gold", "level", "energy", "guild"), state))
+
+        delta = {"type": "delta", "tick": world.tick, "npcs": changed, "guilds": len(world.guilds),
+                 "events": world.out.events}
+        message = (json.dumps(delta, ensure_ascii=False) + "\n").encode("utf-8")
+        self._loop.call_soon_threadsafe(self._broadcast, message)
+
+        if self._snapshot_requested:
+            self._snapshot_requested = False
+            snapshot = {"type": "snapshot", **world.state_dict()}
+            payload = (json.dumps(snapshot, ensure_ascii=False) + "\n").encode("utf-8")
+            self._loop.call_soon_threadsafe(self._send_snapshot, payload)
+
+    # ---- event loop side ----
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        if self.path:
+            server = asyncio.start_unix_server(self._handle, path=self.path)
+        else:
+            server = asyncio.start_server(self._handle, self.host, self.port)
+        self._server = self._loop.run_until_complete(server)
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.close()
+
+    async def _shutdown(self):
+        self._server.close()
+        handlers = []
+        for client in list(self.clients):
+            handlers.append(client.handler)
+            client.writer.transport.abort()   # handler sees EOF and cleans up
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    def _broadcast(self, message):
+        for client in self.clients:
+            self._enqueue(client, message)
+
+    def _send_snapshot(self, payload):
+        for client in self.clients:
+            if client.wants_snapshot:
+                client.wants_snapshot = False
+                self._enqueue(client, payload)
+
+    def _enqueue(self, client, message):
+        if client.queue.full():
+            # slow client: drop its backlog, it will get a snapshot instead
+            client.dropped += client.queue.qsize()
+            while not client.queue.empty():
+                client.queue.get_nowait()
+            client.wants_snapshot = True
+            self._snapshot_requested = True
+            return
+        client.queue.put_nowait(message)
+
+    async def _handle(self, reader, writer):
+        client = _Client(writer, self.queue_size)
+        client.handler = asyncio.current_task()
+        self.clients.add(client)
+        self._snapshot_requested = True
+        client.sender = asyncio.ensure_future(self._send_loop(client))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip() == b"snapshot":
+                    client.wants_snapshot = True
+                    self._snapshot_requested = True
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(client)
+            client.sender.cancel()
+            writer.close()
+
+    async def _send_loop(self, client):
+        try:
+            while True:
+                message = await client.queue.get()
+                client.writer.write(message)
+                await client.writer.drain()
+        except ConnectionError:
+            pass
+
+
+async def _watch(target):
+    if target and not target.isdigit():
+        reader, writer = await asyncio.open_unix_connection(target)
+    else:
+        reader, writer = await asyncio.open_connection("127.0.0.1", int(target or 8765))
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        message = json.loads(line)
+        if message["type"] == "snapshot":
+            print(f"[tick {message['tick']}] snapshot: {len(message['npcs'])} NPCs, {len(message['guilds'])} guilds")
+        else:
+            print(f"[tick {message['tick']}] {len(message['npcs'])} NPCs changed")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_watch(sys.argv[1] if len(sys.argv) > 1 else None))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,57 @@
+"""Generators used to bootstrap large worlds: names, archetype mixes, initial relationships."""
+import itertools
+import random
+
+# consonant + vowel pairs: every syllable is two letters, so any string of
+# syllables splits back in exactly one way and generated names never collide
+SYLLABLES = [c + v for c in "bdfghklmnrstvz" for v in "aeiou"]
+
+# below this size every pair gets a starting relation (like the hand-made world)
+DENSE_RELATIONS_LIMIT = 2000
+DEFAULT_DEGREE = 4
+
+
+def generate_names(count):
+    """`count` unique names: every two-syllable name in order, then three syllables, and so on."""
+    names = []
+    length = 2
+    while len(names) < count:
+        combos = itertools.product(SYLLABLES, repeat=length)
+        names.extend("".join(parts).capitalize() for parts in itertools.islice(combos, count - len(names)))
+        length += 1
+    return names
+
+
+def sample_archetypes(count, distribution):
+    """Draw `count` archetype names from {archetype: weight}."""
+    names = list(distribution)
+    cum_weights = list(itertools.accumulate(distribution.values()))
+    return random.choices(names, cum_weights=cum_weights, k=count)
+
+
+def seed_relationships(npcs, degree=None, low=-5, high=5):
+    """Give every NPC small random starting relations in one pass.
+
+    Small worlds (or degree=None below DENSE_RELATIONS_LIMIT) get every pair,
+    larger ones get `degree` random acquaintances per NPC.
+    """
+    n = len(npcs)
+    if n < 2:
+        return
+    names = [npc.name for npc in npcs]
+    values = range(low, high + 1)
+
+    if degree is None and n <= DENSE_RELATIONS_LIMIT:
+        for i, npc in enumerate(npcs):
+            others = names[:i] + names[i + 1:]
+            npc.relationships = dict(zip(others, random.choices(values, k=n - 1)))
+        return
+
+    # draw every acquaintance and value up front, then slice them per NPC
+    degree = min(degree or DEFAULT_DEGREE, n - 1)
+    targets = random.choices(names, k=n * degree)
+    relation_values = random.choices(values, k=n * degree)
+    for i, npc in enumerate(npcs):
+        start = i * degree
+        npc.relationships = dict(zip(targets[start:start + degree], relation_values[start:start + degree]))
+        npc.relationships.pop(npc.name, None)
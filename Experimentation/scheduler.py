@@ -0,0 +1,101 @@
+import time
+
+
+class TickScheduler:
+    """Fixed-rate tick loop.
+
+    Every tick has a deadline on a fixed grid (start + n * tick_duration), and the
+    loop only sleeps for whatever is left of the budget after the tick's work.
+    When a tick overruns, the next ones start immediately (catch-up) up to
+    `max_catchup` ticks; anything later than that is dropped and the grid is
+    re-anchored so the world does not try to replay a long stall.
+    While the loop is `shed_after` or more ticks behind, the tick function is
+    told to skip optional work (persistence, analytics).
+    """
+
+    def __init__(self, tick_duration, max_catchup=3, shed_after=1):
+        self.tick_duration = tick_duration
+        self.max_catchup = max_catchup
+        self.shed_after = shed_after
+
+        self.ticks = 0
+        self.missed_deadlines = 0   # ticks that finished after their deadline
+        self.catchup_ticks = 0      # ticks started without sleeping because the previous one overran
+        self.dropped_ticks = 0      # ticks given up on after a long stall
+        self.shed_ticks = 0         # ticks run without optional work
+        self.max_overrun = 0.0
+
+        # jitter = how late a tick starts compared to its slot on the grid
+        self.jitter_total = 0.0
+        self.jitter_max = 0.0
+
+        self.work_total = 0.0
+        self.work_max = 0.0
+
+    def run(self, tick_fn, max_ticks=None):
+        """Call tick_fn(optional_work) at a fixed rate until max_ticks (or forever)."""
+        period = self.tick_duration
+        clock = time.perf_counter
+        next_start = clock()
+        catching_up = False
+
+        while max_ticks is None or self.ticks < max_ticks:
+            started = clock()
+            lag = max(0.0, started - next_start)
+            self.jitter_total += lag
+            self.jitter_max = max(self.jitter_max, lag)
+
+            behind = int(lag // period)
+            if catching_up:
+                self.catchup_ticks += 1
+            optional_work = behind < self.shed_after
+            if not optional_work:
+                self.shed_ticks += 1
+
+            tick_fn(optional_work)
+
+            finished = clock()
+            work = finished - started
+            self.work_total += work
+            self.work_max = max(self.work_max, work)
+            self.ticks += 1
+
+            next_start += period
+            catching_up = finished > next_start
+            if catching_up:
+                overrun = finished - next_start
+                self.missed_deadlines += 1
+                self.max_overrun = max(self.max_overrun, overrun)
+
+                # whole slots already lost; only max_catchup of them are replayed
+                lost = int(overrun // period)
+                if lost > self.max_catchup:
+                    dropped = lost - self.max_catchup
+                    self.dropped_ticks += dropped
+                    next_start += dropped * period
+            else:
+                time.sleep(next_start - finished)
+
+    def stats(self):
+        ticks = max(1, self.ticks)
+        return {
+            "ticks": self.ticks,
+            "missed_deadlines": self.missed_deadlines,
+            "catchup_ticks": self.catchup_ticks,
+            "dropped_ticks": self.dropped_ticks,
+            "shed_ticks": self.shed_ticks,
+            "max_overrun_ms": self.max_overrun * 1000,
+            "jitter_avg_ms": self.jitter_total / ticks * 1000,
+            "jitter_max_ms": self.jitter_max * 1000,
+            "work_avg_ms": self.work_total / ticks * 1000,
+            "work_max_ms": self.work_max * 1000,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (
+            f"Ticks: {s['ticks']} | missed deadlines: {s['missed_deadlines']} "
+            f"(catch-up {s['catchup_ticks']}, dropped {s['dropped_ticks']}, shed {s['shed_ticks']}) | "
+            f"work avg {s['work_avg_ms']:.1f} ms, max {s['work_max_ms']:.1f} ms | "
+            f"jitter avg {s['jitter_avg_ms']:.2f} ms, max {s['jitter_max_ms']:.2f} ms"
+        )
@@ -0,0 +1,348 @@
+"""Compact binary, columnar snapshot format for the world state.
+
+Layout of a file:
+
+    MAGIC (8 bytes) | header length (uint32) | JSON header | padding | blocks...
+
+The header describes every block (offset from the start of the data area, byte
+length, array typecode, compression). NPC attributes are stored as typed
+columns, all strings (NPC names, archetypes, guild names) live once in string
+tables, and relationships are either a dense int8 N*N matrix or a sparse COO
+block (row, col, value) sorted by row, whichever is smaller. Relationships
+that exist with value 0 are kept; in the dense matrix, NO_RELATION (-128,
+outside the -100..100 range) marks pairs without one.
+
+Inventories are one int64 column per good ("inventory_<good>"). The
+market's last prices and open orders, which hold escrowed gold and goods,
+are small and go into the JSON header.
+
+Uncompressed blocks are 8-byte aligned and read through mmap, so opening even a
+very large snapshot only parses the header; columns are exposed as zero-copy
+memoryviews (np.frombuffer(view, dtype) works on them as well).
+"""
+import array
+import bisect
+import json
+import mmap
+import struct
+import sys
+import zlib
+
+MAGIC = b"NPCSNAP1"
+ALIGN = 8
+
+INT_COLUMNS = ("hp", "max_hp", "gold", "level", "energy")
+TRAIT_COLUMNS = ("aggression", "social", "greedy", "cautious")
+NO_RELATION = -128
+
+
+def is_columnar(filename):
+    with open(filename, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _string_table(strings):
+    blob = bytearray()
+    offsets = array.array("q", [0])
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def save_columnar(world, filename, compress=False, relationships="auto"):
+    """Write the world as a columnar snapshot.
+
+    relationships: "dense", "sparse" or "auto" (pick the smaller encoding).
+    compress: zlib-compress every block (smaller file, but no longer mmap-able).
+    """
+    npcs = world.npcs
+    index = {npc.name: i for i, npc in enumerate(npcs)}
+    guild_index = {guild: i for i, guild in enumerate(world.guilds)}
+    archetype_names = sorted({npc.archetype_name for npc in npcs})
+    archetype_index = {name: i for i, name in enumerate(archetype_names)}
+
+    blocks = {}
+    for col in INT_COLUMNS:
+        blocks[col] = array.array("q", (getattr(npc, col) for npc in npcs))
+    for col in TRAIT_COLUMNS:
+        blocks[col] = array.array("d", (getattr(npc, col) for npc in npcs))
+    goods = sorted(set(world.market.books).union(*(npc.inventory for npc in npcs)))
+    for good in goods:
+        blocks["inventory_" + good] = array.array("q", (npc.inventory.get(good, 0) for npc in npcs))
+    blocks["archetype"] = array.array("i", (archetype_index[npc.archetype_name] for npc in npcs))
+    blocks["guild"] = array.array("i", (guild_index.get(npc.guild, -1) for npc in npcs))
+
+    blocks["names_offsets"], blocks["names"] = _string_table(npc.name for npc in npcs)
+    blocks["archetypes_offsets"], blocks["archetypes"] = _string_table(archetype_names)
+    blocks["guilds_offsets"], blocks["guilds"] = _string_table(g.name for g in world.guilds)
+
+    # guild members (guild, npc) and wars (guild, guild) as pairs
+    members = array.array("i")
+    for gi, guild in enumerate(world.guilds):
+        for m in guild.members:
+            if m.name in index:
+                members.extend((gi, index[m.name]))
+    wars = array.array("i")
+    for gi, guild in enumerate(world.guilds):
+        for enemy in guild.enemies:
+            if enemy in guild_index:
+                wars.extend((gi, guild_index[enemy]))
+    blocks["guild_members"] = members
+    blocks["guild_wars"] = wars
+
+    n = len(npcs)
+    rows, cols, vals = array.array("i"), array.array("i"), array.array("b")
+    for i, npc in enumerate(npcs):
+        for j in sorted(index[name] for name in npc.relationships if name in index):
+            rows.append(i)
+            cols.append(j)
+            vals.append(npc.relationships[npcs[j].name])
+
+    if relationships == "auto":
+        relationships = "dense" if n * n <= len(vals) * 9 else "sparse"
+    if relationships == "dense":
+        matrix = bytearray([NO_RELATION & 0xFF]) * (n * n)
+        with memoryview(matrix).cast("b") as dense:
+            for i, j, v in zip(rows, cols, vals):
+                dense[i * n + j] = v
+        blocks["rel_matrix"] = matrix
+    else:
+        blocks["rel_rows"], blocks["rel_cols"], blocks["rel_values"] = rows, cols, vals
+
+    header = {
+        "tick": world.tick,
+        "count": n,
+        "guild_count": len(world.guilds),
+        "byteorder": sys.byteorder,
+        "relationships": relationships,
+        "no_relation": NO_RELATION,
+        "goods": goods,
+        "market": world.market.state(),
+        "blocks": {},
+    }
+    payloads = []
+    offset = 0
+    for name, data in blocks.items():
+        typecode = data.typecode if isinstance(data, array.array) else "B"
+        raw = data.tobytes() if isinstance(data, array.array) else bytes(data)
+        payload = zlib.compress(raw) if compress else raw
+        header["blocks"][name] = {
+            "offset": offset,
+            "length": len(payload),
+            "raw_length": len(raw),
+            "typecode": typecode,
+            "compressed": compress,
+        }
+        padding = -len(payload) % ALIGN
+        payloads.append(payload + b"\0" * padding)
+        offset += len(payload) + padding
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (-(len(MAGIC) + 4 + len(header_bytes)) % ALIGN)
+
+    with open(filename, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for payload in payloads:
+            f.write(payload)
+
+
+class ColumnarSnapshot:
+    """Read-only view of a columnar snapshot (use as a context manager or call close())."""
+
+    def __init__(self, filename):
+        self._file = open(filename, "rb")
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError(f"{filename} is not a columnar world snapshot")
+        (header_len,) = struct.unpack("<I", self._file.read(4))
+        self.header = json.loads(self._file.read(header_len))
+        self._data_start = len(MAGIC) + 4 + header_len
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._cache = {}
+
+        self.tick = self.header["tick"]
+        self.count = self.header["count"]
+        self.guild_count = self.header["guild_count"]
+
+    def close(self):
+        for view in self._cache.values():
+            view.release()
+        self._cache.clear()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # a caller still holds a column view; the map closes with it
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def has_block(self, name):
+        return name in self.header["blocks"]
+
+    def column(self, name):
+        """Typed view of a block: zero-copy for uncompressed, same-endian files."""
+        if name in self._cache:
+            return self._cache[name]
+        meta = self.header["blocks"][name]
+        start = self._data_start + meta["offset"]
+        swap = self.header["byteorder"] != sys.byteorder and meta["typecode"] not in "bB"
+
+        if meta["compressed"] or swap:
+            raw = self._mmap[start:start + meta["length"]]
+            if meta["compressed"]:
+                raw = zlib.decompress(raw)
+            data = array.array(meta["typecode"])
+            data.frombytes(raw)
+            if swap:
+                data.byteswap()
+            view = memoryview(data)
+        else:
+            view = memoryview(self._mmap)[start:start + meta["length"]].cast(meta["typecode"])
+
+        self._cache[name] = view
+        return view
+
+    def _string(self, table, i):
+        offsets = self.column(table + "_offsets")
+        return bytes(self.column(table)[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def name(self, i):
+        return self._string("names", i)
+
+    def names(self):
+        return [self.name(i) for i in range(self.count)]
+
+    def archetype(self, i):
+        return self._string("archetypes", self.column("archetype")[i])
+
+    def guild_name(self, gi):
+        return self._string("guilds", gi)
+
+    def relations(self, i):
+        """Relationship row of NPC i as {npc index: value}."""
+        n = self.count
+        if self.header["relationships"] == "dense":
+            # copy the row out, so no view of the mmap outlives this call
+            with self.column("rel_matrix")[i * n:(i + 1) * n] as view:
+                row = array.array("b", view.tobytes())
+            # older files have no marker and store missing relationships as 0
+            missing = self.header.get("no_relation", 0)
+            return {j: v for j, v in enumerate(row) if v != missing}
+        rows = self.column("rel_rows")
+        lo = bisect.bisect_left(rows, i)
+        hi = bisect.bisect_right(rows, i, lo)
+        cols, values = self.column("rel_cols"), self.column("rel_values")
+        return {cols[k]: values[k] for k in range(lo, hi)}
+
+    def inventory(self, i):
+        """Goods NPC i holds (outside of open orders) as {good: qty}."""
+        counts = ((good, self.column("inventory_" + good)[i]) for good in self.header.get("goods", []))
+        return {good: qty for good, qty in counts if qty}
+
+    def npc_record(self, i):
+        """One NPC as a dict shaped like an entry of the JSON snapshot."""
+        guild = self.column("guild")[i]
+        return {
+            "name": self.name(i),
+            **{col: self.column(col)[i] for col in INT_COLUMNS},
+            "guild": self.guild_name(guild) if guild >= 0 else None,
+            "relationships": {self.name(j): v for j, v in self.relations(i).items()},
+            "inventory": self.inventory(i),
+            "archetype": self.archetype(i),
+            "traits": {col: self.column(col)[i] for col in TRAIT_COLUMNS},
+        }
+
+    def to_dict(self):
+        """Whole snapshot in the same shape as the JSON format."""
+        members = self.column("guild_members")
+        wars = self.column("guild_wars")
+        guilds = [{"name": self.guild_name(gi), "members": [], "enemies": []} for gi in range(self.guild_count)]
+        for k in range(0, len(members), 2):
+            guilds[members[k]]["members"].append(self.name(members[k + 1]))
+        for k in range(0, len(wars), 2):
+            guilds[wars[k]]["enemies"].append(guilds[wars[k + 1]]["name"])
+        return {
+            "tick": self.tick,
+            "npcs": [self.npc_record(i) for i in range(self.count)],
+            "guilds": guilds,
+            "market": self.header.get("market"),
+        }
+
+
+def load_columnar(filename):
+    return ColumnarSnapshot(filename)
+
+
+def check_round_trip(count=60, ticks=200, seed=1, observed=None):
+    """Save and reload a running world in both formats; gold and goods must be conserved.
+
+    With `observed` (a number of NPCs), the world runs with level of detail
+    and only that many NPCs at full fidelity. Gold is only created by work
+    and never destroyed, so gold plus escrow must not drop from one tick to
+    the next in either mode; every NPC starts with 500 extra gold so that
+    losing any shows.
+    """
+    import contextlib
+    import io
+    import os
+    import random
+    import tempfile
+
+    import exper
+
+    def totals(world):
+        escrow_gold, escrow_goods = world.market.escrow()
+        goods = dict(escrow_goods)
+        for npc in world.npcs:
+            for good, qty in npc.inventory.items():
+                goods[good] = goods.get(good, 0) + qty
+        return sum(npc.gold for npc in world.npcs) + escrow_gold, {g: q for g, q in goods.items() if q}
+
+    random.seed(seed)
+    world = exper.create_world(count)
+    for npc in world.npcs:
+        npc.gold += 500
+    if observed is not None:
+        world.enable_lod(observed=[npc.name for npc in world.npcs[:observed]])
+    mode = "full" if observed is None else f"lod, {observed} observed"
+
+    ok = True
+    gold = totals(world)[0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(ticks):
+            world.world_tick(optional_work=False)
+            now = totals(world)[0]
+            if now < gold:
+                ok = False
+                print(f"tick {world.tick}: gold plus escrow dropped from {gold} to {now}", file=sys.stderr)
+            gold = now
+    expected = totals(world)
+    open_orders = len(world.market.state()["orders"])
+    print(f"{mode}: gold plus escrow {'never dropped' if ok else 'DROPPED'} over {ticks} ticks")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("json", "columnar"):
+            path = os.path.join(tmp, "world." + fmt)
+            world.save_state(path, format=fmt)
+            loaded = exper.World.load_state(path)
+            got = totals(loaded)
+            same = got == expected and len(loaded.market.state()["orders"]) == open_orders
+            print(f"{fmt:>8}: gold {got[0]} (expected {expected[0]}), goods {sum(got[1].values())} "
+                  f"(expected {sum(expected[1].values())}), {open_orders} open orders: {'ok' if same else 'MISMATCH'}")
+            ok = ok and same
+    return ok
+
+
+if __name__ == "__main__":
+    results = [check_round_trip(observed=observed) for observed in (None, 0, 10)]
+    raise SystemExit(0 if all(results) else 1)
@@ -0,0 +1,131 @@
+import random
+
+AFFINITY_THRESHOLD = 20   # relation value that counts as a positive edge
+BATCH_SIZE = 256          # NPCs relabelled per update
+MAX_COMMUNITY = 8         # members a community may grow to
+
+
+class SocialGraph:
+    """Positive-affinity communities over NPC relationships.
+
+    Communities come from asynchronous label propagation on the sparse graph of
+    positive edges: every NPC takes the label with the highest summed affinity
+    among its friends. A community that has reached max_size takes no new
+    members; without the cap, one label floods every connected friend graph
+    and the whole world ends up as a single community.
+    Each update only relabels the next BATCH_SIZE NPCs
+    (round-robin), so a full pass is spread over several ticks, while queries
+    (community of an NPC, a random peer from it) are O(1).
+    """
+
+    def __init__(self, threshold=AFFINITY_THRESHOLD, batch_size=BATCH_SIZE, max_size=MAX_COMMUNITY):
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.max_size = max_size
+        self.labels = {}    # npc name -> community label
+        self.members = {}   # community label -> list of npc names
+        self._slot = {}     # npc name -> position inside its members list
+        self._cursor = 0
+
+    def update(self, world):
+        npcs = world.npcs
+        if not npcs:
+            return
+        start = self._cursor % len(npcs)
+        for k in range(min(self.batch_size, len(npcs))):
+            self._relabel(npcs[(start + k) % len(npcs)])
+        self._cursor = start + self.batch_size
+
+    def _relabel(self, npc):
+        if not npc.is_alive():
+            self._move(npc.name, None)
+            return
+
+        current = self.labels.get(npc.name, npc.name)
+        scores = {}
+        for other, value in npc.relationships.items():
+            if value >= self.threshold:
+                label = self.labels.get(other, other)
+                if label != current and len(self.members.get(label, ())) >= self.max_size:
+                    continue    # full
+                scores[label] = scores.get(label, 0) + value
+
+        if current in scores:
+            scores[current] += 1  # stay put on ties, keeps labels from flickering
+        label = max(scores, key=scores.get) if scores else npc.name
+        self._move(npc.name, label)
+
+    def _move(self, name, label):
+        old = self.labels.get(name)
+        if old == label:
+            return
+        if old is not None:
+            group = self.members[old]
+            i = self._slot.pop(name)
+            last = group.pop()
+            if last != name:
+                group[i] = last
+                self._slot[last] = i
+            if not group:
+                del self.members[old]
+            del self.labels[name]
+        if label is not None:
+            group = self.members.setdefault(label, [])
+            self._slot[name] = len(group)
+            group.append(name)
+            self.labels[name] = label
+
+    def community_of(self, name):
+        return self.labels.get(name)
+
+    def community_size(self, name):
+        label = self.labels.get(name)
+        return len(self.members[label]) if label is not None else 0
+
+    def same_community(self, a, b):
+        label = self.labels.get(a)
+        return label is not None and label == self.labels.get(b)
+
+    def pick_peer(self, name, accept=None, tries=8):
+        """Random other member of name's community passing accept(name), or None."""
+        label = self.labels.get(name)
+        if label is None:
+            return None
+        group = self.members[label]
+        if len(group) < 2:
+            return None
+        for _ in range(tries):
+            peer = random.choice(group)
+            if peer != name and (accept is None or accept(peer)):
+                return peer
+        return None
+
+    def communities(self, min_size=2):
+        return {label: group for label, group in self.members.items() if len(group) >= min_size}
+
+
+def check_communities(count=60, ticks=300, seeds=(1, 2, 3)):
+    """Run small worlds and check they keep more than one community."""
+    import contextlib
+    import io
+
+    import exper
+
+    ok = True
+    for seed in seeds:
+        random.seed(seed)
+        world = exper.create_world(count)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(ticks):
+                # without the optional work (it saves files); the graph update is part of it
+                world.world_tick(optional_work=False)
+                world.social_graph.update(world)
+        alive = sum(npc.is_alive() for npc in world.npcs)
+        sizes = sorted((len(g) for g in world.social_graph.communities().values()), reverse=True)
+        print(f"seed {seed}: {alive} alive, {len(sizes)} communities, sizes {sizes}")
+        ok = ok and len(sizes) > 1 and sizes[0] < alive
+    return ok
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if check_communities() else 1)
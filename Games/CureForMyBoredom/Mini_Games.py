@@ -2,6 +2,11 @@ import random
 import time
 import os
 import sys
+from functools import lru_cache
+
+# shared helpers live at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from sampling import AliasTable
 
 # -----------------------
 # Colors
@@ -102,15 +107,7 @@ REWARD_MULTIPLIERS = {
     "💎": 50,
 }
 
-def weighted_choice(symbols):
-    total = sum(w for s, w in symbols)
-    r = random.randint(1, total)
-    for symbol, weight in symbols:
-        r -= weight
-        if r <= 0:
-            return symbol
-    # на всякий случай:
-    return symbols[-1][0]
+SLOT_TABLE = AliasTable.from_pairs(SLOT_SYMBOLS)  # O(1) per spin
 
 def spin_animation_simple(spin_count=12, delay=0.07):
     """Slot animation: single line, no extra lines on screen."""
@@ -151,7 +148,7 @@ def play_slots(casino: Casino):
     time.sleep(0.1)
 
     # final result on 3 reels
-    result = [weighted_choice(SLOT_SYMBOLS) for _ in range(3)]
+    result = [SLOT_TABLE.sample() for _ in range(3)]
     print(f"\n{Colors.BOLD}{' | '.join(result)}{Colors.RESET}\n")
 
     # win logic: three same - win, otherwise - loss
@@ -432,6 +429,23 @@ ARTIFACTS = {
     ]
 }
 
+@lru_cache(maxsize=None)
+def chest_rarity_table(legendary_chance):
+    """Rarity odds of a d100 roll against cumulative thresholds, one table per boost level."""
+    thresholds = [
+        ("LEGENDARY", legendary_chance),
+        ("EPIC", legendary_chance + EPIC_CHANCE),
+        ("RARE", legendary_chance + EPIC_CHANCE + RARE_CHANCE),
+        ("COMMON", 100),
+    ]
+    weights = {}
+    covered = 0
+    for rarity, upto in thresholds:
+        upto = max(covered, min(100, upto))
+        weights[rarity] = upto - covered
+        covered = upto
+    return AliasTable.from_dict(weights)
+
 def open_chest(casino: Casino, collection: set, boost_value: int):
     if casino.balance < CHEST_PRICE:
         print(f"{Colors.RED}Not enough chips! Need {CHEST_PRICE}.{Colors.RESET}")
@@ -443,16 +457,7 @@ def open_chest(casino: Casino, collection: set, boost_value: int):
     legendary_chance = LEGENDARY_BASE_CHANCE + boost_value
     boost_value = 0  # boost is one-time
 
-    roll = random.randint(1, 100)
-
-    if roll <= legendary_chance:
-        rarity = "LEGENDARY"
-    elif roll <= legendary_chance + EPIC_CHANCE:
-        rarity = "EPIC"
-    elif roll <= legendary_chance + EPIC_CHANCE + RARE_CHANCE:
-        rarity = "RARE"
-    else:
-        rarity = "COMMON"
+    rarity = chest_rarity_table(legendary_chance).sample()
 
     item = random.choice(ARTIFACTS[rarity])
     new = item not in collection
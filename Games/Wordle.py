@@ -1,42 +1,45 @@
 import random
+import sys
+from functools import lru_cache
+
+from wordle_index import COLOR_NAMES, CandidateIndex, Knowledge, colors, encode, np
+from wordle_lexicon import Lexicon, is_word
 
 WORDS = [
     "apple","about","other","which","there","their","world","music","light","sight",
     "night","right","thing","could","would","sweet","spice","stone","grass","water",
     "river","ocean","shore","earth","storm","cloud","above","below","after","again",
     "house","heart","dream","peace","power","speed","quick","laugh","smile","happy",
-    "angry","brave","crazy","smart","sharp","blunt","bring","check","close",
-    "catch","carry","clean","clear","climb","count","cover","dance","drink","drive",
-    "eager","early","enter","every","enemy","error","equal","faith","fancy","fault",
-    "fever","field","final","first","floor","flame","fresh","front","frost","fruit",
-    "giant","globe","glory","grace","great","green","group","guard","guess","guide",
-    "habit","happy","harsh","hatey","heavy","honey","honor","human","humor","ideal",
-    "image","issue","ivory","jelly","judge","juice","jumpy","karma","knife","known",
-    "label","laser","later","laugh","learn","leave","level","light","limit","local",
-    "logic","loner","loose","lucky","magic","major","match","metal","miner","model",
-    "month","moral","mouse","movie","music","nasty","never","night","noble","noise",
-    "oasis","occur","offer","often","order","other","outer","paint","panel","paper",
-    "party","peace","phase","phone","photo","piece","pilot","place","plain","plane",
-    "plant","plate","point","power","press","price","pride","print","prove","punch",
-    "queen","quick","quiet","radio","raise","reach","react","ready","realm","refer",
-    "relax","reply","right","rival","river","robot","rough","round","route","royal",
-    "ruler","salty","scale","scene","scope","score","scout","sense","serve","share",
-    "sharp","sheep","sheet","shift","shine","shirt","shock","shoot","short","sight",
-    "since","skill","sleep","slice","slide","small","smart","smoke","snake","solar",
-    "sound","space","spare","speak","speed","spell","spice","spike","spine","spite",
-    "sport","stage","stamp","stand","steam","steel","stone","store","storm","story",
-    "straw","style","sugar","sunny","super","sweet","swift","sword","table","taste",
-    "teach","teeth","thank","theme","there","thick","thief","thing","think","third",
-    "those","three","throw","tight","tiger","timer","title","today","topic","torch",
-    "total","touch","tower","track","trade","train","treat","trend","trial","tribe",
-    "trick","trust","truth","twice","uncle","union","until","upper","upset",
-    "urban","usual","vapor","value","vital","vivid","voice","voter","wagon","water",
-    "weary","weird","whale","wheat","wheel","where","which","while","white","whole",
-    "whose","woman","world","worry","worth","wound","write","wrong","yield","young",
-    "youth","zebra","zeros","zones","winds","flock","crane","bliss","charm","flute",
-    "ridge","flash","prism","amber","cabin","cargo","crown","demon","fable","forge",
-    "glare","grind","hatch","ivory","jewel","linen","mimic","naval","nylon","orbit",
-    "piano","quill","ranch","scrap","shear","tango","umbra","vocal","woven","xenon"
+    "angry","brave","crazy","smart","sharp","blunt","bring","check","close","catch",
+    "carry","clean","clear","climb","count","cover","dance","drink","drive","eager",
+    "early","enter","every","enemy","error","equal","faith","fancy","fault","fever",
+    "field","final","first","floor","flame","fresh","front","frost","fruit","giant",
+    "globe","glory","grace","great","green","group","guard","guess","guide","habit",
+    "harsh","heavy","honey","honor","human","humor","ideal","image","issue","ivory",
+    "jelly","judge","juice","jumpy","karma","knife","known","label","laser","later",
+    "learn","leave","level","limit","local","logic","loner","loose","lucky","magic",
+    "major","match","metal","miner","model","month","moral","mouse","movie","nasty",
+    "never","noble","noise","oasis","occur","offer","often","order","outer","paint",
+    "panel","paper","party","phase","phone","photo","piece","pilot","place","plain",
+    "plane","plant","plate","point","press","price","pride","print","prove","punch",
+    "queen","quiet","radio","raise","reach","react","ready","realm","refer","relax",
+    "reply","rival","robot","rough","round","route","royal","ruler","salty","scale",
+    "scene","scope","score","scout","sense","serve","share","sheep","sheet","shift",
+    "shine","shirt","shock","shoot","short","since","skill","sleep","slice","slide",
+    "small","smoke","snake","solar","sound","space","spare","speak","spell","spike",
+    "spine","spite","sport","stage","stamp","stand","steam","steel","store","story",
+    "straw","style","sugar","sunny","super","swift","sword","table","taste","teach",
+    "teeth","thank","theme","thick","thief","think","third","those","three","throw",
+    "tight","tiger","timer","title","today","topic","torch","total","touch","tower",
+    "track","trade","train","treat","trend","trial","tribe","trick","trust","truth",
+    "twice","uncle","union","until","upper","upset","urban","usual","vapor","value",
+    "vital","vivid","voice","voter","wagon","weary","weird","whale","wheat","wheel",
+    "where","while","white","whole","whose","woman","worry","worth","wound","write",
+    "wrong","yield","young","youth","zebra","zeros","zones","winds","flock","crane",
+    "bliss","charm","flute","ridge","flash","prism","amber","cabin","cargo","crown",
+    "demon","fable","forge","glare","grind","hatch","jewel","linen","mimic","naval",
+    "nylon","orbit","piano","quill","ranch","scrap","shear","tango","umbra","vocal",
+    "woven","xenon"
 ]
 
 def color_letter(letter, color):
@@ -69,19 +72,48 @@ def compare_words(secret, guess):
 
     return result
 
-def play():
-    secret = random.choice(WORDS)
+def make_solver(lexicon, hard_mode=False):
+    # numpy is only needed for the assistant, so import it on demand
+    from wordle_feedback import FeedbackMatrix
+    from wordle_solver import Solver
+
+    return Solver(FeedbackMatrix.build(lexicon.allowed, lexicon.answers), hard_mode=hard_mode)
+
+def read_guess(lexicon=None, knowledge=None):
+    # without a lexicon any 5 letters are a word; with `knowledge`, the guess
+    # must also follow the hard mode rules
+    while True:
+        guess = input().lower()
+        valid = guess in lexicon if lexicon is not None else is_word(guess)
+        if valid:
+            error = knowledge.hard_mode_error(guess) if knowledge else None
+            if error is None:
+                return guess
+            print(error + ".")
+        elif len(guess) == 5 and guess.isalpha():
+            print("Not in word list.")
+        else:
+            print("Type a word with 5 letters.")
+
+def play(assist=False, hard_mode=False, lexicon=None):
+    # guesses are only checked against a word list the player loaded
+    word_list = lexicon
+    lexicon = lexicon or Lexicon(WORDS)
+    secret = random.choice(lexicon.answers)
     attempts = 6
+    solver = make_solver(lexicon, hard_mode) if assist else None
+    # the remaining-words count needs numpy; the game itself does not
+    index = CandidateIndex(lexicon.answers) if np is not None else None
+    remaining = index.all() if index else None
+    knowledge = Knowledge()
 
     print("Wordle!")
     print("6 attempts.\n")
 
     for attempt in range(1, attempts + 1):
-        while True:
-            guess = input().lower()
-            if len(guess) == 5 and guess.isalpha():
-                break
-            print("Type a word with 5 letters.")
+        if solver:
+            print(f"Suggestion: {solver.suggest().upper()}")
+        guess = read_guess(word_list, knowledge if hard_mode else None)
 
         result = compare_words(secret, guess)
 
@@ -93,7 +125,92 @@ def play():
             print("Congrats! You guessed :", secret.upper())
             return
 
+        code = encode(result)
+        knowledge.add(guess, code)
+        if index:
+            index.narrow(remaining, guess, code)
+            count = index.count(remaining)
+            print("1 word remains." if count == 1 else f"{count} words remain.")
+        if solver:
+            solver.update(guess, code)
+
     print("You lose.")
     print("The word was:", secret.upper())
 
-play()
+BOARDS_PER_LINE = 4
+
+@lru_cache(maxsize=4096)
+def board_row(guess, code):
+    return " ".join(color_letter(letter, COLOR_NAMES[c]) for letter, c in zip(guess, colors(code)))
+
+def render_turn(guess, codes, solved):
+    # one row per board, BOARDS_PER_LINE boards side by side; boards solved earlier stay blank
+    blank = " " * 19
+    cells = [blank if done else board_row(guess, int(code)) for code, done in zip(codes, solved)]
+    return "\n".join("   ".join(cells[i:i + BOARDS_PER_LINE]) for i in range(0, len(cells), BOARDS_PER_LINE))
+
+def play_boards(boards=4, assist=False, lexicon=None):
+    # Quordle-style: every guess counts on all boards, boards + 5 attempts to solve them all
+    if np is None:
+        print("Playing several boards needs numpy.")
+        return
+    from wordle_feedback import GREEN_ALL, FeedbackMatrix
+    from wordle_solver import Solver, row, suggest_boards
+
+    word_list = lexicon
+    lexicon = lexicon or Lexicon(WORDS)
+    table = FeedbackMatrix.build(lexicon.allowed, lexicon.answers)
+    secrets = random.sample(lexicon.answers, boards)
+    targets = np.array([table.answer_index[w] for w in secrets])
+    solved = np.zeros(boards, dtype=bool)
+    attempts = boards + 5
+    solvers = [Solver(table) for _ in secrets] if assist else None
+
+    # everything a turn prints goes out in one write
+    out = [f"Wordle x{boards}!", f"{attempts} attempts.\n"]
+    for attempt in range(1, attempts + 1):
+        if solvers:
+            open_boards = [solver for solver, done in zip(solvers, solved) if not done]
+            out.append(f"Suggestion: {suggest_boards(open_boards).upper()}")
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
+
+        guess = read_guess(word_list)
+        codes = row(table, guess)[targets]      # the feedback on every board in one lookup
+        out = [render_turn(guess, codes, solved)]
+        solved |= codes == GREEN_ALL
+        if solvers:
+            for b in np.flatnonzero(~solved):
+                solvers[b].update(guess, int(codes[b]))
+        out.append(f"{int(solved.sum())}/{boards} solved.")
+        if solved.all():
+            out.append(f"Congrats! You solved all {boards} boards in {attempt} guesses.")
+            break
+    else:
+        out.append("You lose.")
+        out.append("The words were: " + " ".join(w.upper() for w in secrets))
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
+
+def main(argv):
+    answers_path = allowed_path = None
+    boards = 1
+    args = iter(argv)
+    for arg in args:
+        if arg == "--answers":
+            answers_path = next(args)
+        elif arg == "--allowed":
+            allowed_path = next(args)
+        elif arg == "--boards":
+            boards = int(next(args))
+    lexicon = None
+    if answers_path or allowed_path:
+        # --allowed alone adds guesses to the built-in answers
+        lexicon = Lexicon.load(answers_path, allowed_path, default_answers=WORDS)
+    if boards > 1:
+        play_boards(boards, assist="--assist" in argv, lexicon=lexicon)
+    else:
+        play(assist="--assist" in argv, hard_mode="--hard" in argv, lexicon=lexicon)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
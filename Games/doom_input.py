@@ -0,0 +1,201 @@
+"""Keyboard input for mini_doom.
+
+Every frame, poll() reads everything waiting on stdin without blocking and
+parses it into key names ('w', 'up', 'esc', ...). Escape sequences split
+across two reads are completed on the next poll.
+
+A terminal never says when a key is released: a held key just shows up
+again every repeat interval, after a longer initial delay. A first press
+is therefore a tap and counts as down for the frame it arrives in only,
+so a tap moves as far as one frame of movement. When the same key comes
+again within INITIAL_TIMEOUT (the auto-repeat delay), it is known to be
+held: from then on it stays down until it has been silent for
+REPEAT_TIMEOUT, so releasing it stops it within that time. Holding a key
+thus moves for one frame, pauses for the terminal's repeat delay, and
+then moves smoothly.
+
+Terminals only auto-repeat the last key pressed, so with two keys held
+the older one drops out after its timeout. On Windows the real key state
+is read with GetAsyncKeyState instead, so combinations work there.
+"""
+import os
+import sys
+import time
+
+INITIAL_TIMEOUT = 0.55  # a second press this soon is auto-repeat (usual delay 250-500 ms)
+REPEAT_TIMEOUT = 0.12   # a few repeat intervals (~30 ms each)
+
+SEQUENCES = {
+    "\x1b[A": "up", "\x1b[B": "down", "\x1b[C": "right", "\x1b[D": "left",
+    "\x1bOA": "up", "\x1bOB": "down", "\x1bOC": "right", "\x1bOD": "left",
+}
+CONTROL = {"\x1b": "esc", "\x03": "ctrl-c", "\r": "enter", "\n": "enter", " ": "space"}
+WINDOWS_ARROWS = {b'H': 'up', b'P': 'down', b'M': 'right', b'K': 'left'}
+VIRTUAL_KEYS = {"up": 0x26, "down": 0x28, "left": 0x25, "right": 0x27, "space": 0x20}
+
+if os.name == 'nt':
+    import msvcrt
+    try:
+        import ctypes
+        _key_state = ctypes.windll.user32.GetAsyncKeyState
+    except (ImportError, AttributeError):
+        _key_state = None
+else:
+    import select
+
+
+def parse(data):
+    """Split raw input into key names. Returns (keys, leftover) where leftover
+    is an escape sequence that may still be incomplete."""
+    keys = []
+    i = 0
+    while i < len(data):
+        ch = data[i]
+        if ch == "\x1b":
+            if i + 1 == len(data) or (i + 2 == len(data) and data[i + 1] in "[O"):
+                return keys, data[i:]
+            seq = data[i:i + 3]
+            if seq in SEQUENCES:
+                keys.append(SEQUENCES[seq])
+                i += 3
+                continue
+            if data[i + 1] in "[O":
+                # some other CSI/SS3 sequence (F-keys, Home...): skip it up to its final byte
+                j = i + 2
+                while j < len(data) and not ("@" <= data[j] <= "~"):
+                    j += 1
+                if j == len(data):
+                    return keys, data[i:]
+                i = j + 1
+                continue
+            keys.append("esc")
+            i += 1
+            continue
+        keys.append(CONTROL.get(ch, ch.lower()))
+        i += 1
+    return keys, ""
+
+
+class Keyboard:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdin
+        self.expires = {}       # key -> time it counts as released
+        self.repeating = set()  # keys known to be held down
+        self.last_press = {}    # key -> time of its latest press
+        self.pending = ""
+        self.fresh = set()      # keys that arrived in the last poll
+
+    def _read(self):
+        if os.name == 'nt':
+            keys = []
+            while msvcrt.kbhit():
+                ch = msvcrt.getch()
+                if ch in (b'\x00', b'\xe0'):
+                    key = WINDOWS_ARROWS.get(msvcrt.getch())
+                    if key:
+                        keys.append(key)
+                else:
+                    ch = ch.decode('utf-8', errors='ignore')
+                    keys.append(CONTROL.get(ch, ch.lower()))
+            return keys
+
+        fd = self.stream.fileno()
+        data = b""
+        while select.select([fd], [], [], 0)[0]:
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                break
+            data += chunk
+        if not data and self.pending:
+            # nothing followed since the last frame: a lone ESC was the key itself
+            keys = ["esc"] if self.pending == "\x1b" else []
+            self.pending = ""
+            return keys
+        keys, self.pending = parse(self.pending + data.decode("utf-8", errors="ignore"))
+        return keys
+
+    def poll(self, now=None):
+        """Drain pending input; returns the keys that arrived since the last poll."""
+        now = time.perf_counter() if now is None else now
+        keys = self._read()
+        self.fresh = set(keys)
+        for key in keys:
+            previous = self.last_press.get(key)
+            self.last_press[key] = now
+            if key in self.repeating or (previous is not None and now - previous <= INITIAL_TIMEOUT):
+                self.repeating.add(key)
+                self.expires[key] = now + REPEAT_TIMEOUT
+            else:
+                self.expires[key] = now     # a tap: down for this frame only
+        for key in [k for k, t in self.expires.items() if t < now]:
+            del self.expires[key]
+            self.repeating.discard(key)
+        return keys
+
+    def held(self, *keys):
+        """True if any of `keys` is down (as of the last poll)."""
+        if os.name == 'nt' and _key_state:
+            # real key state, plus taps that were already released when we polled
+            return any(k in self.fresh or _key_state(VIRTUAL_KEYS.get(k, ord(k.upper()) if len(k) == 1 else 0)) & 0x8000
+                       for k in keys)
+        return any(k in self.expires for k in keys)
+
+
+def _self_check():
+    keys, rest = parse("wq\x1b[A\x1b[Cd\x1b")
+    assert keys == ["w", "q", "up", "right", "d"] and rest == "\x1b", (keys, rest)
+    keys, rest = parse(rest + "[D\x1b[15~E")
+    assert keys == ["left", "e"] and rest == "", (keys, rest)
+    assert parse("\x1b[")[1] == "\x1b[" and parse("\x03")[0] == ["ctrl-c"]
+
+    # held table: a tap lasts one frame, a repeating key REPEAT_TIMEOUT past its last repeat
+    kb = Keyboard()
+    feed = []
+    kb._read = lambda: feed
+    feed[:] = ["w"]
+    kb.poll(0.0)
+    assert kb.held("w")
+    feed[:] = []
+    kb.poll(0.033)
+    assert not kb.held("w")
+    feed[:] = ["w"]                     # a tap long after the last one is a tap again
+    kb.poll(1.0)
+    feed[:] = []
+    kb.poll(1.033)
+    assert not kb.held("w") and "w" not in kb.repeating
+    for t in (1.4, 1.43, 1.46):         # auto-repeat after the initial delay
+        feed[:] = ["w"]
+        kb.poll(t)
+    feed[:] = []
+    kb.poll(1.5)
+    assert kb.held("w") and "w" in kb.repeating
+    kb.poll(1.6)
+    assert not kb.held("w")
+    print("input checks passed")
+
+
+def _watch():
+    """Show what poll() sees at 30 polls per second: try holding keys."""
+    import termios
+    import tty
+    old = termios.tcgetattr(sys.stdin)
+    tty.setcbreak(sys.stdin.fileno())
+    kb = Keyboard()
+    try:
+        print("hold some keys; ESC to quit")
+        while True:
+            keys = kb.poll()
+            if keys or kb.expires:
+                print(f"\r\x1b[2Knew: {' '.join(keys):20} held: {' '.join(sorted(kb.expires))}", end="", flush=True)
+            if "esc" in keys:
+                break
+            time.sleep(1 / 30)
+    finally:
+        termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old)
+        print()
+
+
+if __name__ == "__main__":
+    _self_check()
+    if os.name != 'nt' and sys.stdin.isatty():
+        _watch()
@@ -0,0 +1,226 @@
+"""Maps for mini_doom: loading, compact storage and the distance field.
+
+A map is a flat bytearray, one byte per cell (0 = empty, otherwise the wall
+type), so a 1024x1024 maze takes 1 MiB instead of a million list slots.
+
+Text map format, one line per row:
+    '.', ' ' or '0'   empty floor
+    'P'               empty floor, player start
+    'E', 'H', 'A'     empty floor with an enemy / health / ammo sprite
+    anything else     wall ('1'-'9' keep their number as the wall type)
+Short lines are padded with walls.
+
+`distance` holds, for every cell, the Chebyshev distance (in cells) to the
+nearest wall, capped at 255. A ray standing in a cell with distance d can
+move (d - 1) cells along its major axis without passing a wall, which lets
+the raycaster jump over open space instead of stepping one cell at a time.
+
+Run this file to generate a large maze and compare raycasting speed on it.
+"""
+import random
+
+from doom_sprites import MAP_LETTERS, Sprite
+
+try:
+    import numpy as np
+except ImportError:  # the distance field falls back to plain Python loops
+    np = None
+
+EMPTY = ".0 P"
+
+
+class GridMap:
+    def __init__(self, width, height, cells=None, start=None, sprites=None):
+        self.width, self.height = width, height
+        self.sprites = sprites or []
+        self.cells = bytearray(cells) if cells is not None else bytearray(width * height)
+        if len(self.cells) != width * height:
+            raise ValueError(f"expected {width * height} cells, got {len(self.cells)}")
+        self.start = start or self._first_empty()
+        self.distance = distance_field(self.cells, width, height)
+
+    @classmethod
+    def from_rows(cls, rows, start=None, sprites=None):
+        """From a list of rows of ints (the built-in world_map)."""
+        width = len(rows[0])
+        return cls(width, len(rows), bytes(v for row in rows for v in row), start, sprites)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            lines = [line.rstrip("\r\n") for line in f]
+        while lines and not lines[-1].strip():
+            lines.pop()
+        width = max(len(line) for line in lines)
+        cells = bytearray()
+        start = None
+        sprites = []
+        for y, line in enumerate(lines):
+            for x, ch in enumerate(line.ljust(width, "#")):
+                if ch in EMPTY or ch in MAP_LETTERS:
+                    cells.append(0)
+                    if ch == "P":
+                        start = (x + 0.5, y + 0.5)
+                    elif ch in MAP_LETTERS:
+                        sprites.append(Sprite(x + 0.5, y + 0.5, MAP_LETTERS[ch]))
+                else:
+                    cells.append(int(ch) if ch in "123456789" else 1)
+        return cls(width, len(lines), cells, start, sprites)
+
+    def save(self, path):
+        lines = [["#" if v else "." for v in self.cells[y * self.width:(y + 1) * self.width]]
+                 for y in range(self.height)]
+        letters = {kind: letter for letter, kind in MAP_LETTERS.items()}
+        for sprite in self.sprites:
+            lines[int(sprite.y)][int(sprite.x)] = letters[sprite.kind]
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines("".join(line) + "\n" for line in lines)
+
+    def is_wall(self, x, y):
+        """Wall test for a point or cell; everything outside the map is wall."""
+        x, y = int(x), int(y)
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.cells[y * self.width + x] != 0
+        return True
+
+    def _first_empty(self):
+        i = self.cells.find(0)
+        return (i % self.width + 0.5, i // self.width + 0.5) if i >= 0 else (0.5, 0.5)
+
+
+def distance_field(cells, width, height):
+    """Chebyshev distance to the nearest wall (or the map edge), as a bytearray.
+
+    Two raster passes: top-left to bottom-right takes the up/left neighbours,
+    then back the other way with down/right. Every step costs 1, which is
+    exact for the Chebyshev metric.
+    """
+    if np is not None:
+        return _distance_field_numpy(cells, width, height)
+    return _distance_field_python(cells, width, height)
+
+
+def _distance_field_python(cells, width, height, cap=255):
+    # one ring of wall around the map, so the edge needs no special case
+    pw = width + 2
+    dist = bytearray(pw * (height + 2))
+    for y in range(height):
+        dist[(y + 1) * pw + 1:(y + 1) * pw + 1 + width] = bytes(0 if v else cap for v in cells[y * width:(y + 1) * width])
+
+    for i in range(pw + 1, pw * (height + 1) - 1):
+        d = dist[i]
+        if d:
+            dist[i] = min(d, dist[i - 1] + 1, dist[i - pw - 1] + 1, dist[i - pw] + 1, dist[i - pw + 1] + 1)
+    for i in range(pw * (height + 1) - 2, pw, -1):
+        d = dist[i]
+        if d:
+            dist[i] = min(d, dist[i + 1] + 1, dist[i + pw + 1] + 1, dist[i + pw] + 1, dist[i + pw - 1] + 1)
+    return bytearray(b for y in range(height) for b in dist[(y + 1) * pw + 1:(y + 1) * pw + 1 + width])
+
+
+def _distance_field_numpy(cells, width, height, cap=255):
+    # Same two passes, one row at a time. Inside a row, d[x] = min(d[x], d[x-1] + 1)
+    # is a running minimum of (d[k] - k) shifted back by x.
+    grid = np.frombuffer(bytes(cells), dtype=np.uint8).reshape(height, width)
+    dist = np.where(grid != 0, 0, cap).astype(np.int32)
+    # walls all around the map
+    padded = np.zeros((height + 2, width + 2), dtype=np.int32)
+    padded[1:-1, 1:-1] = dist
+    idx = np.arange(width + 2)
+
+    for y in range(1, height + 1):
+        above = padded[y - 1]
+        row = padded[y]
+        row[1:-1] = np.minimum(row[1:-1], np.minimum(np.minimum(above[:-2], above[1:-1]), above[2:]) + 1)
+        row[:] = np.minimum.accumulate(row - idx) + idx
+    for y in range(height, 0, -1):
+        below = padded[y + 1]
+        row = padded[y]
+        row[1:-1] = np.minimum(row[1:-1], np.minimum(np.minimum(below[:-2], below[1:-1]), below[2:]) + 1)
+        row[:] = (np.minimum.accumulate((row + idx)[::-1]) - idx[::-1])[::-1]
+    return bytearray(np.minimum(padded[1:-1, 1:-1], cap).astype(np.uint8).tobytes())
+
+
+def generate_maze(width, height, rooms=40, seed=None):
+    """Random maze (recursive backtracker on odd cells) with rectangular rooms carved in."""
+    rng = random.Random(seed)
+    width, height = width | 1, height | 1
+    cells = bytearray([1]) * (width * height)
+
+    stack = [(1, 1)]
+    cells[width + 1] = 0
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy, dx, dy) for dx, dy in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                   if 0 < x + dx < width - 1 and 0 < y + dy < height - 1 and cells[(y + dy) * width + x + dx]]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny, dx, dy = rng.choice(options)
+        cells[(y + dy // 2) * width + x + dx // 2] = 0
+        cells[ny * width + nx] = 0
+        stack.append((nx, ny))
+
+    for _ in range(rooms):
+        rw, rh = rng.randint(4, max(4, width // 8)), rng.randint(4, max(4, height // 8))
+        rx, ry = rng.randint(1, max(1, width - rw - 1)), rng.randint(1, max(1, height - rh - 1))
+        for y in range(ry, min(ry + rh, height - 1)):
+            cells[y * width + rx:y * width + min(rx + rw, width - 1)] = bytes(min(rx + rw, width - 1) - rx)
+    return GridMap(width, height, cells)
+
+
+def _benchmark():
+    import sys
+    import time
+
+    import mini_doom
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    start = time.perf_counter()
+    maze = generate_maze(size, size, rooms=size // 8, seed=1)
+    print(f"{maze.width}x{maze.height} maze with distance field: {time.perf_counter() - start:.2f} s")
+
+    # the distance field against a brute force search, on a small map
+    small = generate_maze(41, 31, rooms=6, seed=2)
+    brute = bytearray(
+        min([max(abs(x - wx), abs(y - wy)) for wy in range(-1, small.height + 1) for wx in range(-1, small.width + 1)
+             if not (0 <= wx < small.width and 0 <= wy < small.height) or small.cells[wy * small.width + wx]] + [255])
+        for y in range(small.height) for x in range(small.width))
+    print("distance field matches brute force:",
+          _distance_field_python(small.cells, small.width, small.height) == brute,
+          np is None or _distance_field_numpy(small.cells, small.width, small.height) == brute)
+
+    # cameras in the biggest open cells, looking around
+    centres = sorted(range(len(maze.distance)), key=maze.distance.__getitem__)[-4:]
+    cameras = []
+    for i in centres:
+        for a in (0.3, 1.9, 3.6, 5.0):
+            cam = mini_doom.Camera(i % maze.width + 0.5, i // maze.width + 0.5)
+            cam.rotate(a)
+            cameras.append(cam)
+
+    toy = mini_doom.Renderer()
+    toy_cams = [mini_doom.Camera(x, y) for x, y in ((1.5, 1.5), (10.5, 3.5), (19.5, 5.5), (12.5, 7.5))]
+    for backend in ("python", "numpy"):
+        for label, grid, cams in (("toy map", toy.world_map, toy_cams), (f"{maze.width}^2 maze", maze, cameras)):
+            renderer = mini_doom.Renderer(grid, backend=backend)
+            frames = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < 1.0:
+                renderer.render(cams[frames % len(cams)])
+                frames += 1
+            print(f"  {backend:>6}, {label:>12}: {frames / (time.perf_counter() - start):6.1f} FPS")
+
+    # skipping must not change the picture
+    plain = mini_doom.Renderer(maze)
+    same = 0
+    for cam in cameras:
+        skipped = plain.render(cam)
+        mini_doom.SKIP_EMPTY = False
+        same += skipped == plain.render(cam)
+        mini_doom.SKIP_EMPTY = True
+    print(f"frames identical with and without skipping: {same}/{len(cameras)}")
+
+
+if __name__ == "__main__":
+    _benchmark()
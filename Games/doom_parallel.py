@@ -0,0 +1,171 @@
+"""Column-parallel rendering for mini_doom on a pool of worker processes.
+
+Every column is traced independently, so the screen is split into one band
+of columns per worker. The workers are started once and keep the map. Each
+frame they receive only the camera state and the frame size through a
+Pipe, and they write their results straight into shared memory:
+
+    params  3 int32 per column: line height, shade, side (0, 0, 0 = no wall)
+    depth   w doubles, the z-buffer for sprites
+
+The main process waits for every band to report done, then looks each
+column up in mini_doom's column_strip cache and transposes, exactly like
+cast_rays after its ray loop. Nothing the size of the frame is pickled or
+built cell by cell. That serial step is also why only the tracing scales
+with the workers: the pool pays off when tracing dominates (large, deep
+maps, several cores). On a single core the workers only take turns, so
+it is no faster than mini_doom.cast_rays and usually slower.
+
+Run this file to compare it with the single-process renderers.
+"""
+import math
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import mini_doom
+from mini_doom import WALL_CHARS, column_strip
+
+EMPTY_COLUMN = (0, 0, 0)    # column_strip key of a column without a wall
+
+
+def _worker(conn, index, workers, shm_name, max_w, grid, max_depth, skip_empty):
+    mini_doom.MAX_DEPTH, mini_doom.SKIP_EMPTY = max_depth, skip_empty
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        depth = shm.buf[:8 * max_w].cast("d")
+        params = shm.buf[8 * max_w:].cast("i")
+        shades = len(WALL_CHARS) - 1
+        while True:
+            job = conn.recv()
+            if job is None:
+                break
+            frame, (pos_x, pos_y, dir_x, dir_y, plane_x, plane_y), w, h = job
+            for x in range(index * w // workers, (index + 1) * w // workers):
+                camera_x = 2 * x / w - 1
+                perp_dist, side = mini_doom.trace_ray(pos_x, pos_y, dir_x + plane_x * camera_x,
+                                                      dir_y + plane_y * camera_x, grid)
+                if perp_dist is None:
+                    depth[x] = math.inf
+                    params[3 * x:3 * x + 3] = EMPTY_COLUMN
+                else:
+                    # the same key cast_rays uses for column_strip
+                    depth[x] = perp_dist
+                    params[3 * x] = min(int(h / perp_dist), 2 * h)
+                    params[3 * x + 1] = min(shades, int(perp_dist))
+                    params[3 * x + 2] = side
+            conn.send(frame)
+        del depth, params
+    finally:
+        shm.close()
+
+
+class ParallelCaster:
+    """cast_rays() replacement backed by a persistent pool of column-band workers.
+
+    Sized for frames up to max_w columns (the height does not touch the shared
+    buffer); call close() (or use it as a context manager) to stop the workers
+    and free the shared memory.
+    """
+
+    def __init__(self, grid, max_w, workers=None):
+        self.grid = grid
+        self.workers = workers or os.cpu_count() or 1
+        self.max_w = max_w
+        self.shm = shared_memory.SharedMemory(create=True, size=8 * max_w + 4 * 3 * max_w)
+        self.depth = self.shm.buf[:8 * max_w].cast("d")
+        self.params = self.shm.buf[8 * max_w:].cast("i")
+        self.frame = 0
+        self.conns = []
+        self.procs = []
+        for i in range(self.workers):
+            parent, child = mp.Pipe()
+            proc = mp.Process(target=_worker, daemon=True,
+                              args=(child, i, self.workers, self.shm.name, max_w, grid,
+                                    mini_doom.MAX_DEPTH, mini_doom.SKIP_EMPTY))
+            proc.start()
+            child.close()
+            self.conns.append(parent)
+            self.procs.append(proc)
+
+    def cast(self, pos_x, pos_y, dir_x, dir_y, plane_x, plane_y, grid, w, h, zbuffer=None):
+        if grid is not self.grid:
+            raise ValueError("ParallelCaster renders the map it was started with")
+        if w > self.max_w:
+            raise ValueError(f"{w} columns do not fit the shared buffer")
+        self.frame += 1
+        job = (self.frame, (pos_x, pos_y, dir_x, dir_y, plane_x, plane_y), w, h)
+        for conn in self.conns:
+            conn.send(job)
+        for conn in self.conns:
+            conn.recv()
+
+        if zbuffer is not None:
+            zbuffer[:] = self.depth[:w].tolist()
+        params = self.params[:3 * w].tolist()
+        columns = [column_strip(params[k], params[k + 1], params[k + 2], h) for k in range(0, 3 * w, 3)]
+        return [list(row) for row in zip(*columns)]
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self.procs:
+            proc.join(timeout=2)
+            if proc.is_alive():
+                proc.terminate()
+        self.conns, self.procs = [], []
+        if self.shm is not None:
+            self.params.release()
+            self.depth.release()
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _benchmark():
+    import time
+
+    cams = []
+    for i, (px, py) in enumerate([(3.5, 1.5), (12.2, 3.7), (20.5, 7.5), (6.4, 5.2)]):
+        for a in (0.0, 0.7, 1.5707963, 2.9, 4.4):
+            cam = mini_doom.Camera(px, py)
+            cam.rotate(a + i * 0.13)
+            cams.append(cam)
+    grid = mini_doom.DEFAULT_MAP
+    print(f"{os.cpu_count()} CPU(s)")
+
+    for w, h in ((100, 40), (320, 100), (640, 200)):
+        reference = [mini_doom.cast_rays(*cam.state(), grid, w, h) for cam in cams]
+        renderers = [("single process", lambda cam: mini_doom.cast_rays(*cam.state(), grid, w, h))]
+        pools = []
+        for workers in sorted({2, 4, os.cpu_count() or 1}):
+            pool = ParallelCaster(grid, w, workers)
+            pools.append(pool)
+            renderers.append((f"{workers} workers", lambda cam, pool=pool: pool.cast(*cam.state(), grid, w, h)))
+        try:
+            print(f"{w}x{h}:")
+            for name, render in renderers:
+                same = sum(render(cam) == ref for cam, ref in zip(cams, reference))
+                frames = 0
+                start = time.perf_counter()
+                while time.perf_counter() - start < 1.0:
+                    render(cams[frames % len(cams)])
+                    frames += 1
+                elapsed = time.perf_counter() - start
+                print(f"  {name:>14}: {elapsed / frames * 1000:6.2f} ms/frame ({same}/{len(cams)} frames identical)")
+        finally:
+            for pool in pools:
+                pool.close()
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,97 @@
+"""Per-frame phase timing for mini_doom.
+
+The render path calls mark(phase) when it finishes a phase; the time since
+the previous mark is charged to that phase:
+
+    rays     ray stepping and wall columns (the whole cast for numpy/parallel)
+    rows     transposing the column strips into rows
+    sprites  sprite projection and drawing
+    join     building the output string (diff or full redraw)
+    write    terminal write + flush
+
+status() gives the rolling average and worst case of each phase over the
+last `window` frames, for the status line. With `csv_path`, every frame
+is also written out for offline analysis.
+
+When profiling is off the game uses NULL_PROFILER, whose methods do
+nothing, so the cost is a handful of empty calls per frame.
+"""
+import csv
+import time
+from collections import deque
+
+PHASES = ("rays", "rows", "sprites", "join", "write")
+
+
+class FrameProfiler:
+    enabled = True
+
+    def __init__(self, window=60, csv_path=None):
+        self.window = window
+        self.history = {phase: deque(maxlen=window) for phase in PHASES}
+        self.sums = dict.fromkeys(PHASES, 0.0)
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frames = 0
+        self._last = 0.0
+        self._csv_file = self._csv = None
+        if csv_path:
+            self._csv_file = open(csv_path, "w", newline="")
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(["frame"] + [f"{phase}_ms" for phase in PHASES] + ["total_ms"])
+
+    def begin(self):
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self._last
+        self._last = now
+
+    def end(self):
+        for phase, spent in self.current.items():
+            history = self.history[phase]
+            if len(history) == self.window:
+                self.sums[phase] -= history[0]
+            history.append(spent)
+            self.sums[phase] += spent
+        if self._csv:
+            self._csv.writerow([self.frames] + [f"{self.current[p] * 1000:.3f}" for p in PHASES]
+                               + [f"{sum(self.current.values()) * 1000:.3f}"])
+        self.frames += 1
+
+    def averages(self):
+        """{phase: (average, worst)} in seconds over the window."""
+        return {phase: (self.sums[phase] / len(history) if history else 0.0, max(history, default=0.0))
+                for phase, history in self.history.items()}
+
+    def status(self):
+        return " ".join(f"{phase} {avg * 1000:.1f}/{worst * 1000:.1f}"
+                        for phase, (avg, worst) in self.averages().items()) + " ms (avg/worst)"
+
+    def close(self):
+        if self._csv_file:
+            self._csv_file.close()
+            self._csv_file = self._csv = None
+
+
+class NullProfiler:
+    enabled = False
+
+    def begin(self):
+        pass
+
+    def mark(self, phase):
+        pass
+
+    def end(self):
+        pass
+
+    def status(self):
+        return ""
+
+    def close(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
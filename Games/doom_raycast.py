@@ -0,0 +1,133 @@
+"""Vectorized NumPy raycasting backend for mini_doom.
+
+cast_columns() runs the same DDA as mini_doom.cast_rays, but steps every ray
+at once: each iteration advances all rays that have not hit anything yet
+(the others are masked out) and the loop ends when the longest ray is done.
+The result is per-column distance and side arrays; cast_rays_numpy() turns
+them into the (line height, shade, side) keys of mini_doom.column_strip and
+builds the same buffer of cells the reference renderer produces, from the
+same strip cache. The MAX_DEPTH cutoff and the distance-field jumps over
+open space are applied the same way, per ray.
+
+Run this file to check it against mini_doom.cast_rays and time both.
+"""
+import numpy as np
+
+import mini_doom
+from mini_doom import WALL_CHARS, column_strip
+
+
+def map_array(world_map):
+    """(cells, distance) of a GridMap as uint8 arrays, without copying."""
+    shape = (world_map.height, world_map.width)
+    return (np.frombuffer(world_map.cells, dtype=np.uint8).reshape(shape),
+            np.frombuffer(world_map.distance, dtype=np.uint8).reshape(shape))
+
+
+def cast_columns(pos_x, pos_y, dir_x, dir_y, plane_x, plane_y, grid, w):
+    """DDA for all w columns at once. Returns (hit, perp_dist, side) arrays."""
+    grid, distance = grid
+    camera_x = 2 * np.arange(w) / w - 1
+    ray_dir_x = dir_x + plane_x * camera_x
+    ray_dir_y = dir_y + plane_y * camera_x
+
+    map_x = np.full(w, int(pos_x), dtype=np.int64)
+    map_y = np.full(w, int(pos_y), dtype=np.int64)
+
+    with np.errstate(divide='ignore'):
+        delta_x = np.where(ray_dir_x != 0, np.abs(1 / ray_dir_x), 1e30)
+        delta_y = np.where(ray_dir_y != 0, np.abs(1 / ray_dir_y), 1e30)
+
+    step_x = np.where(ray_dir_x < 0, -1, 1)
+    step_y = np.where(ray_dir_y < 0, -1, 1)
+    side_x = np.where(ray_dir_x < 0, (pos_x - map_x) * delta_x, (map_x + 1.0 - pos_x) * delta_x)
+    side_y = np.where(ray_dir_y < 0, (pos_y - map_y) * delta_y, (map_y + 1.0 - pos_y) * delta_y)
+
+    skip_t = 1 / np.maximum(np.abs(ray_dir_x), np.abs(ray_dir_y))
+
+    rows, cols = grid.shape
+    side = np.zeros(w, dtype=np.int8)
+    hit = np.zeros(w, dtype=bool)
+    active = np.ones(w, dtype=bool)
+
+    while active.any():
+        active &= np.minimum(side_x, side_y) <= mini_doom.MAX_DEPTH
+        go_x = active & (side_x < side_y)
+        go_y = active & ~go_x
+        side_x = np.where(go_x, side_x + delta_x, side_x)
+        map_x = np.where(go_x, map_x + step_x, map_x)
+        side_y = np.where(go_y, side_y + delta_y, side_y)
+        map_y = np.where(go_y, map_y + step_y, map_y)
+        side = np.where(go_x, 0, np.where(go_y, 1, side))
+
+        outside = active & ((map_x < 0) | (map_x >= cols) | (map_y < 0) | (map_y >= rows))
+        active &= ~outside
+        wall = np.zeros(w, dtype=bool)
+        wall[active] = grid[map_y[active], map_x[active]] != 0
+        hit |= wall
+        active &= ~wall
+
+        if mini_doom.SKIP_EMPTY:
+            d = np.zeros(w, dtype=np.int64)
+            d[active] = distance[map_y[active], map_x[active]]
+            jump = d > 2
+            if jump.any():
+                t = np.where(side == 0, side_x - delta_x, side_y - delta_y) + (d - 1) * skip_t - 1e-9
+                map_x = np.where(jump, (pos_x + ray_dir_x * t).astype(np.int64), map_x)
+                map_y = np.where(jump, (pos_y + ray_dir_y * t).astype(np.int64), map_y)
+                side_x = np.where(jump, np.where(ray_dir_x < 0, pos_x - map_x, map_x + 1.0 - pos_x) * delta_x, side_x)
+                side_y = np.where(jump, np.where(ray_dir_y < 0, pos_y - map_y, map_y + 1.0 - pos_y) * delta_y, side_y)
+
+    perp = np.where(side == 0, side_x - delta_x, side_y - delta_y)
+    perp = np.maximum(perp, 0.1)
+    return hit, perp, side
+
+
+def cast_rays_numpy(pos_x, pos_y, dir_x, dir_y, plane_x, plane_y, world_map, w, h, zbuffer=None):
+    """Same buffer (and z-buffer) as mini_doom.cast_rays, built from column arrays."""
+    hit, perp, side = cast_columns(pos_x, pos_y, dir_x, dir_y, plane_x, plane_y, map_array(world_map), w)
+    if zbuffer is not None:
+        zbuffer[:] = np.where(hit, perp, np.inf).tolist()
+    # the column_strip keys of cast_rays; (0, 0, 0) where no wall was hit
+    line_h = np.where(hit, np.minimum((h / perp).astype(np.int64), 2 * h), 0)
+    shade = np.where(hit, np.minimum(len(WALL_CHARS) - 1, perp.astype(np.int64)), 0)
+    side = np.where(hit, side, 0)
+    columns = [column_strip(*key, h) for key in zip(line_h.tolist(), shade.tolist(), side.tolist())]
+    return [list(row) for row in zip(*columns)]
+
+
+def _benchmark():
+    import time
+
+    def reference(cam, w, h):
+        return mini_doom.cast_rays(*cam, mini_doom.DEFAULT_MAP, w, h)
+
+    # a few positions and headings, including axis-aligned rays (zero ray_dir components)
+    cameras = [(1.5, 1.5, 1.0, 0.0, 0.0, mini_doom.FOV)]
+    for i, (px, py) in enumerate([(3.5, 1.5), (12.2, 3.7), (20.5, 7.5), (6.4, 5.2)]):
+        for a in (0.0, 0.7, 1.5707963, 2.9, 4.4):
+            a += i * 0.13
+            dx, dy = np.cos(a), np.sin(a)
+            cameras.append((px, py, float(dx), float(dy), float(-dy * mini_doom.FOV), float(dx * mini_doom.FOV)))
+
+    for w, h in ((100, 40), (320, 100)):
+        mismatches = sum(
+            reference(cam, w, h) != cast_rays_numpy(*cam, mini_doom.DEFAULT_MAP, w, h) for cam in cameras
+        )
+        print(f"{w}x{h}: {len(cameras) - mismatches}/{len(cameras)} frames identical to the reference")
+
+        grid = map_array(mini_doom.DEFAULT_MAP)
+        for name, fn in (("reference", lambda cam: reference(cam, w, h)),
+                         ("numpy", lambda cam: cast_rays_numpy(*cam, mini_doom.DEFAULT_MAP, w, h)),
+                         ("numpy DDA only", lambda cam: cast_columns(*cam, grid, w))):
+            start = time.perf_counter()
+            frames = 0
+            while time.perf_counter() - start < 1.0:
+                fn(cameras[frames % len(cameras)])
+                frames += 1
+            elapsed = time.perf_counter() - start
+            print(f"  {name:>14}: {elapsed / frames * 1000:.2f} ms/frame")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,203 @@
+"""Frame-diff terminal output for mini_doom.
+
+DiffRenderer remembers the last frame it sent and only emits the cells that
+changed, each changed span starting with a cursor-positioning escape. Inside
+a span, neighbouring cells with the same color are merged, so a run gets one
+color sequence and one reset instead of one pair per cell.
+
+Cells are the strings cast_rays produces (color + glyph + reset, or a bare
+glyph); they are split into (color, glyph) once and cached, and so is their
+size in bytes. The size of the equivalent full redraw, for the status line,
+is kept up to date from the cells compose() finds changed, so it costs
+nothing on rows that did not change.
+
+upscale() stretches a frame rendered at a reduced resolution back to the
+terminal size.
+"""
+import sys
+import time
+
+from doom_profile import NULL_PROFILER
+from mini_doom import RESET
+GAP = 3   # unchanged cells rewritten rather than paying for another cursor move
+
+
+_maps = {}
+
+
+def upscale(buffer, w, h):
+    """Stretch a frame to w x h cells by repeating columns and rows (nearest neighbour)."""
+    src_h, src_w = len(buffer), len(buffer[0])
+    if (src_w, src_h) == (w, h):
+        return buffer
+    key = (src_w, src_h, w, h)
+    maps = _maps.get(key)
+    if maps is None:
+        maps = _maps[key] = ([x * src_w // w for x in range(w)], [y * src_h // h for y in range(h)])
+    cols, rows = maps
+    stretched = {}      # a source row repeated on several lines is stretched once
+    for y in set(rows):
+        row = buffer[y]
+        stretched[y] = [row[x] for x in cols]
+    return [list(stretched[y]) for y in rows]
+
+
+class DiffRenderer:
+    def __init__(self, stream=None, top=1, profiler=NULL_PROFILER):
+        self.stream = stream
+        self.profiler = profiler
+        self.top = top          # terminal row (1-based) of the first frame row
+        self.prev = None
+        self._parts = {}        # cell -> (color, glyph)
+        self._sizes = {}        # cell -> UTF-8 bytes
+        self._full_bytes = 0    # "\x1b[H" + rows joined by newlines, for the current frame
+        self.frames = 0
+        self.last_bytes = 0
+        self.last_full_bytes = 0   # what the full redraw would have sent
+        self.last_time = 0.0
+        self.total_bytes = 0
+        self.total_full_bytes = 0
+        self.total_time = 0.0
+
+    def reset(self):
+        """Forget the previous frame: the next one is drawn in full (after a resize, clear...)."""
+        self.prev = None
+
+    def _split(self, cell):
+        parts = self._parts.get(cell)
+        if parts is None:
+            body = cell[:-len(RESET)] if RESET and cell.endswith(RESET) else cell
+            parts = (body[:-1], body[-1:])
+            self._parts[cell] = parts
+        return parts
+
+    def _size(self, cell):
+        size = self._sizes.get(cell)
+        if size is None:
+            size = self._sizes[cell] = len(cell.encode("utf-8"))
+        return size
+
+    def _span(self, row, start, end, out):
+        """Cells row[start:end], one color sequence per run of the same color."""
+        split = self._split
+        color, glyphs = split(row[start])
+        text = [glyphs]
+        for cell in row[start + 1:end]:
+            c, g = split(cell)
+            if c != color:
+                out.append(color + "".join(text) + (RESET if color else ""))
+                color, text = c, []
+            text.append(g)
+        out.append(color + "".join(text) + (RESET if color else ""))
+
+    def compose(self, buffer):
+        """Escape sequence string that turns the previous frame into `buffer`."""
+        out = []
+        prev = self.prev
+        full = prev is None or len(prev) != len(buffer) or len(prev[0]) != len(buffer[0])
+        size = self._size
+        if full:
+            self._full_bytes = 2 + len(buffer) + sum(size(cell) for row in buffer for cell in row)
+        for y, row in enumerate(buffer):
+            if full:
+                out.append(f"\x1b[{self.top + y};1H")
+                self._span(row, 0, len(row), out)
+                continue
+            old = prev[y]
+            if row == old:
+                continue
+            changed = [x for x, (new, was) in enumerate(zip(row, old)) if new != was]
+            self._full_bytes += sum(size(row[x]) - size(old[x]) for x in changed)
+            # changes at most GAP cells apart share one span (and one cursor move)
+            start = end = changed[0]
+            for x in changed[1:]:
+                if x - end > GAP:
+                    out.append(f"\x1b[{self.top + y};{start + 1}H")
+                    self._span(row, start, end + 1, out)
+                    start = x
+                end = x
+            out.append(f"\x1b[{self.top + y};{start + 1}H")
+            self._span(row, start, end + 1, out)
+        self.prev = [list(row) for row in buffer]
+        return "".join(out)
+
+    def render(self, buffer):
+        start = time.perf_counter()
+        data = self.compose(buffer)
+        self.profiler.mark("join")
+        stream = self.stream or sys.stdout
+        stream.write(data)
+        stream.flush()
+        self.profiler.mark("write")
+        self.last_time = time.perf_counter() - start
+        self.total_time += self.last_time
+
+        self.frames += 1
+        self.last_bytes = len(data.encode("utf-8"))
+        self.last_full_bytes = self._full_bytes
+        self.total_bytes += self.last_bytes
+        self.total_full_bytes += self.last_full_bytes
+
+    def status(self):
+        saved = 100 * (1 - self.last_bytes / self.last_full_bytes) if self.last_full_bytes else 0
+        return (f"{self.last_bytes / 1024:6.1f} KiB/frame (full redraw {self.last_full_bytes / 1024:.1f} KiB,"
+                f" -{saved:.0f}%) | output {self.last_time * 1000:5.1f} ms")
+
+
+
+def _replay(data, grid):
+    """Apply compose() output to `grid` (rows of cells) the way a terminal would."""
+    import re
+    y = x = 0
+    color = ""
+    for move, sgr, glyph in re.findall(r"\x1b\[(\d+;\d+)H|(\x1b\[[\d;]*m)|(.)", data, re.S):
+        if move:
+            row, col = move.split(";")
+            y, x = int(row) - 1, int(col) - 1
+        elif sgr:
+            color = "" if sgr == RESET else sgr
+        else:
+            grid[y][x] = color + glyph + (RESET if color else "")
+            x += 1
+    return grid
+
+
+def _benchmark():
+    import io
+
+    from mini_doom import Renderer, demo_path
+
+    for w, h in ((100, 40), (200, 60)):
+        renderer = Renderer(w=w, h=h)
+        frames = [renderer.render(camera) for camera in demo_path(120)]
+        n = len(frames)
+
+        # correctness: replaying every diff on a virtual screen must give back the frame
+        renderer = DiffRenderer(io.StringIO())
+        screen = [[""] * w for _ in range(h)]
+        ok = True
+        for frame in frames:
+            ok &= _replay(renderer.compose(frame), screen) == frame
+        print(f"{w}x{h}, {n} frames: replayed diffs {'match' if ok else 'DO NOT match'} the frames")
+
+        out = io.StringIO()
+        start = time.perf_counter()
+        for frame in frames:
+            out.write("\x1b[H" + "\n".join("".join(row) for row in frame))
+        full_time = time.perf_counter() - start
+        full_bytes = [len(("\x1b[H" + "\n".join("".join(row) for row in frame)).encode("utf-8")) for frame in frames]
+
+        renderer = DiffRenderer(io.StringIO())
+        tracked = True
+        for frame, expected in zip(frames, full_bytes):
+            renderer.render(frame)
+            tracked &= renderer.last_full_bytes == expected
+        diff_time = renderer.total_time
+        print(f"  full redraw size tracked from the diffs: {'ok' if tracked else 'MISMATCH'}")
+
+        print(f"  full redraw: {renderer.total_full_bytes / n / 1024:6.1f} KiB/frame, {full_time / n * 1000:.2f} ms/frame")
+        print(f"  diff:        {renderer.total_bytes / n / 1024:6.1f} KiB/frame, {diff_time / n * 1000:.2f} ms/frame")
+
+
+if __name__ == "__main__":
+    _benchmark()
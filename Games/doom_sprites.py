@@ -0,0 +1,157 @@
+"""Sprites (enemies, pickups) for mini_doom.
+
+The raycaster fills a z-buffer with the wall distance of every column.
+draw_sprites() then projects each sprite into camera space and culls it
+before touching any cell: behind the camera, beyond MAX_DEPTH, outside the
+screen, or hidden behind walls in every column it covers. It draws the
+survivors far to near, so near sprites cover far ones, and a sprite
+column is only drawn where it is closer than the wall in that column.
+
+Sprite art is scaled to the projected size with nearest neighbour. The
+scaled version is cached as a list of columns, each a list of
+(row, cell) pairs for the opaque pixels only, so drawing a sprite does no
+per-pixel transparency tests.
+"""
+from functools import lru_cache
+
+# kind: (height relative to a wall, art rows, colors by art character)
+KINDS = {
+    "enemy": (0.8, [
+        " ▄█▄ ",
+        "▀▓█▓▀",
+        " ▐█▌ ",
+        " █ █ ",
+    ], {"▄": "\x1b[33m", "█": "\x1b[33m", "▀": "\x1b[33m", "▓": "\x1b[93m", "▐": "\x1b[33m", "▌": "\x1b[33m"}),
+    "health": (0.3, [
+        "▄█▄",
+        "▀█▀",
+    ], {"▄": "\x1b[92m", "█": "\x1b[92m", "▀": "\x1b[92m"}),
+    "ammo": (0.3, [
+        "▐▌▐",
+        "███",
+    ], {"▐": "\x1b[96m", "▌": "\x1b[96m", "█": "\x1b[36m"}),
+}
+PICKUPS = ("health", "ammo")
+MAP_LETTERS = {"E": "enemy", "H": "health", "A": "ammo"}
+
+
+class Sprite:
+    def __init__(self, x, y, kind):
+        self.x, self.y = x, y
+        self.kind = kind
+
+
+@lru_cache(maxsize=512)
+def scaled_mask(kind, w, h):
+    """Art of `kind` scaled to w x h cells: per column, the (row, cell) pairs to draw."""
+    # mini_doom imports this module to build its map, so not at the top
+    from mini_doom import RESET
+
+    _, art, colors = KINDS[kind]
+    art_h, art_w = len(art), len(art[0])
+    columns = []
+    for x in range(w):
+        ax = x * art_w // w
+        column = []
+        for y in range(h):
+            ch = art[y * art_h // h][ax]
+            if ch != " ":
+                color = colors.get(ch, "")
+                column.append((y, color + ch + (RESET if color else "")))
+        columns.append(column)
+    return columns
+
+
+def draw_sprites(buffer, zbuffer, camera, sprites, max_depth):
+    """Draw `sprites` into `buffer` (rows of cells) behind/in front of the walls in `zbuffer`.
+    Returns how many sprites were drawn."""
+    pos_x, pos_y, dir_x, dir_y, plane_x, plane_y = camera
+    h, w = len(buffer), len(buffer[0])
+    inv_det = 1.0 / (plane_x * dir_y - dir_x * plane_y)
+
+    visible = []
+    for sprite in sprites:
+        sx, sy = sprite.x - pos_x, sprite.y - pos_y
+        depth = inv_det * (-plane_y * sx + plane_x * sy)
+        if depth <= 0.2 or depth > max_depth:
+            continue
+        across = inv_det * (dir_y * sx - dir_x * sy)
+        height, art, _ = KINDS[sprite.kind]
+        wall_h = h / depth
+        sh = min(2 * h, max(1, int(wall_h * height)))
+        sw = min(2 * w, max(1, round(sh * len(art[0]) / len(art))))   # keep the art's proportions
+        centre = int(w / 2 * (1 + across / depth))
+        x0 = centre - sw // 2
+        x1 = x0 + sw
+        if x1 <= 0 or x0 >= w:
+            continue    # outside the view frustum
+        # hidden if every column it covers has a closer wall
+        if all(zbuffer[x] <= depth for x in range(max(0, x0), min(w, x1))):
+            continue
+        bottom = h // 2 + int(wall_h / 2)   # standing on the floor
+        visible.append((depth, sprite.kind, x0, bottom - sh, sw, sh))
+
+    visible.sort(reverse=True)
+    for depth, kind, x0, top, sw, sh in visible:
+        columns = scaled_mask(kind, sw, sh)
+        for cx in range(max(0, -x0), min(sw, w - x0)):
+            x = x0 + cx
+            if zbuffer[x] <= depth:
+                continue
+            for dy, cell in columns[cx]:
+                y = top + dy
+                if 0 <= y < h:
+                    buffer[y][x] = cell
+    return len(visible)
+
+
+def collect_pickups(sprites, x, y, radius=0.5):
+    """Remove the pickups within `radius` of (x, y); returns their kinds."""
+    taken = [s for s in sprites if s.kind in PICKUPS and (s.x - x) ** 2 + (s.y - y) ** 2 < radius * radius]
+    for s in taken:
+        sprites.remove(s)
+    return [s.kind for s in taken]
+
+
+def _benchmark():
+    import random
+    import time
+
+    import mini_doom
+    from doom_map import GridMap
+
+    # an open hall with pillars, so most sprites are in view and some are behind pillars
+    size = 40
+    cells = bytearray(size * size)
+    for i in range(size):
+        cells[i] = cells[(size - 1) * size + i] = cells[i * size] = cells[i * size + size - 1] = 1
+    for y in range(6, size - 4, 8):
+        for x in range(6, size - 4, 8):
+            cells[y * size + x] = 1
+    grid = GridMap(size, size, cells)
+    rng = random.Random(5)
+    empty = [(i % grid.width + 0.5, i // grid.width + 0.5) for i, v in enumerate(grid.cells) if not v]
+    cameras = []
+    for x, y in rng.sample(empty, 30):
+        cam = mini_doom.Camera(x, y)
+        cam.rotate(rng.uniform(0, 6.283))
+        cameras.append(cam)
+
+    for count in (0, 12, 50, 200):
+        sprites = [mini_doom.Sprite(x, y, rng.choice(list(KINDS))) for x, y in rng.sample(empty, count)]
+        renderer = mini_doom.Renderer(grid, sprites=sprites)
+        drawn = frames = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < 1.0:
+            renderer.render(cameras[frames % len(cameras)])
+            drawn += renderer.sprites_drawn
+            frames += 1
+        elapsed = time.perf_counter() - start
+        print(f"{count:4} sprites: {elapsed / frames * 1000:5.2f} ms/frame, {drawn / frames:4.1f} drawn per frame")
+    # mini_doom draws with the imported module, not this __main__ copy
+    import doom_sprites
+    print(f"cached masks: {doom_sprites.scaled_mask.cache_info()}")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -2,13 +2,22 @@ import os
 import math
 import time
 import sys
+from functools import lru_cache
+
+from doom_input import Keyboard
+from doom_map import GridMap
+from doom_profile import NULL_PROFILER, FrameProfiler
+from doom_sprites import Sprite, collect_pickups, draw_sprites
 
 # ================== Settings ==================
 W, H = 100, 40
 FOV = 0.66
-MAX_DEPTH = 20.0
+MAX_DEPTH = 20.0    # rays stop here; whatever is further away is not drawn
+SKIP_EMPTY = True   # jump over open space using the map's distance field
 MOVE_SPEED = 2.8
 ROT_SPEED = 2.2
+TARGET_FPS = 30
+MAX_DT = 0.1        # longer frames (a stall, a terminal resize) don't teleport the player
 
 # ================== Map ==================
 world_map = [
@@ -23,109 +32,155 @@ world_map = [
     [1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1]
 ]
 
+DEFAULT_MAP = GridMap.from_rows(world_map, sprites=[
+    Sprite(12.5, 3.5, "enemy"), Sprite(19.5, 5.5, "enemy"), Sprite(6.5, 7.5, "enemy"),
+    Sprite(8.5, 1.5, "health"), Sprite(3.5, 5.5, "ammo"), Sprite(16.5, 7.5, "health"),
+])
+
 WALL_CHARS = " .,:;~=+*#$&%@█"[::-1]
+RESET = "\x1b[0m" if os.name != 'nt' else ""
+if os.name != 'nt':
+    CEILING, FLOOR = "\x1b[44m \x1b[0m", "\x1b[42m \x1b[0m"
+else:
+    CEILING, FLOOR = "░", "▒"
+COLUMN_CACHE_SIZE = 4096    # a 100x40 view uses a few hundred strips
 
 # ================== Terminal ==================
-if os.name == 'nt':
-    os.system('cls')
-    os.system(f'mode con: cols={W} lines={H+3}')
-    import msvcrt
-else:
-    os.system('clear')
-    sys.stdout.write(f"\x1b[8;{H+3};{W}t\x1b[?25l")
-    import termios, tty, select
+if os.name != 'nt':
+    import termios, tty
 
-pos_x, pos_y = 1.5, 1.5
-dir_x, dir_y = 1.0, 0.0
-plane_x, plane_y = 0.0, FOV
+# ================== Camera ==================
+class Camera:
+    def __init__(self, x=1.5, y=1.5, dir_x=1.0, dir_y=0.0, fov=FOV):
+        self.x, self.y = x, y
+        self.dir_x, self.dir_y = dir_x, dir_y
+        # camera plane is perpendicular to the direction, its length sets the FOV
+        self.plane_x, self.plane_y = -dir_y * fov, dir_x * fov
+
+    def state(self):
+        return self.x, self.y, self.dir_x, self.dir_y, self.plane_x, self.plane_y
+
+    def rotate(self, rot):
+        cos, sin = math.cos(rot), math.sin(rot)
+        self.dir_x, self.dir_y = self.dir_x * cos - self.dir_y * sin, self.dir_x * sin + self.dir_y * cos
+        self.plane_x, self.plane_y = self.plane_x * cos - self.plane_y * sin, self.plane_x * sin + self.plane_y * cos
+
+    def move(self, grid, move=0.0, strafe=0.0):
+        """Walk forward/back and sideways on a GridMap, sliding along walls."""
+        if move:
+            nx = self.x + self.dir_x * move
+            ny = self.y + self.dir_y * move
+            if not grid.is_wall(nx, self.y):  # X
+                self.x = nx
+            if not grid.is_wall(self.x, ny):  # Y
+                self.y = ny
+
+        if strafe:
+            nx = self.x + self.dir_y * strafe
+            ny = self.y - self.dir_x * strafe
+            if not grid.is_wall(nx, ny):
+                self.x, self.y = nx, ny
 
-# ================== Input ==================
-def get_key():
-    if os.name == 'nt':
-        if msvcrt.kbhit():
-            ch = msvcrt.getch()
-            if ch in (b'\x00', b'\xe0'):
-                second = msvcrt.getch()
-                if ch == b'\xe0':
-                    if second == b'H': return 'up'
-                    if second == b'P': return 'down'
-                    if second == b'M': return 'right'
-                    if second == b'K': return 'left'
-                return ''
-            else:
-                return ch.decode('utf-8', errors='ignore').lower()
-        return ''
-    else:
-        import select, sys
-        if select.select([sys.stdin], [], [], 0) == ([sys.stdin], [], []):
-            return sys.stdin.read(1)
-        return ''
 
 # ================== RAYCASTING ==================
-def cast_rays():
-    buffer = [[" " for _ in range(W)] for _ in range(H)]
-    for x in range(W):
-        camera_x = 2 * x / W - 1
-        ray_dir_x = dir_x + plane_x * camera_x
-        ray_dir_y = dir_y + plane_y * camera_x
+def trace_ray(pos_x, pos_y, ray_dir_x, ray_dir_y, grid):
+    """DDA through `grid` from the camera. Returns (perp_dist, side), perp_dist None if nothing was hit."""
+    cells, distance = grid.cells, grid.distance
+    map_w, map_h = grid.width, grid.height
 
-        map_x = int(pos_x)
-        map_y = int(pos_y)
+    map_x = int(pos_x)
+    map_y = int(pos_y)
 
-        delta_dist_x = abs(1/ray_dir_x) if ray_dir_x != 0 else 1e30
-        delta_dist_y = abs(1/ray_dir_y) if ray_dir_y != 0 else 1e30
+    delta_dist_x = abs(1/ray_dir_x) if ray_dir_x != 0 else 1e30
+    delta_dist_y = abs(1/ray_dir_y) if ray_dir_y != 0 else 1e30
 
-        if ray_dir_x < 0:
-            step_x = -1
-            side_dist_x = (pos_x - map_x) * delta_dist_x
-        else:
-            step_x = 1
-            side_dist_x = (map_x + 1.0 - pos_x) * delta_dist_x
-        if ray_dir_y < 0:
-            step_y = -1
-            side_dist_y = (pos_y - map_y) * delta_dist_y
-        else:
-            step_y = 1
-            side_dist_y = (map_y + 1.0 - pos_y) * delta_dist_y
-
-        hit = False
-        side = 0
-        while not hit:
-            if side_dist_x < side_dist_y:
-                side_dist_x += delta_dist_x
-                map_x += step_x
-                side = 0
-            else:
-                side_dist_y += delta_dist_y
-                map_y += step_y
-                side = 1
-            if map_x < 0 or map_x >= len(world_map[0]) or map_y < 0 or map_y >= len(world_map):
-                break
-            if world_map[map_y][map_x]:
-                hit = True
+    if ray_dir_x < 0:
+        step_x = -1
+        side_dist_x = (pos_x - map_x) * delta_dist_x
+    else:
+        step_x = 1
+        side_dist_x = (map_x + 1.0 - pos_x) * delta_dist_x
+    if ray_dir_y < 0:
+        step_y = -1
+        side_dist_y = (pos_y - map_y) * delta_dist_y
+    else:
+        step_y = 1
+        side_dist_y = (map_y + 1.0 - pos_y) * delta_dist_y
+
+    # open space can be crossed (d - 1) cells along the major axis at a time
+    skip_t = 1 / max(abs(ray_dir_x), abs(ray_dir_y)) if SKIP_EMPTY else 0
 
-        if hit:
+    side = 0
+    while True:
+        if min(side_dist_x, side_dist_y) > MAX_DEPTH:
+            return None, side
+        if side_dist_x < side_dist_y:
+            side_dist_x += delta_dist_x
+            map_x += step_x
+            side = 0
+        else:
+            side_dist_y += delta_dist_y
+            map_y += step_y
+            side = 1
+        if map_x < 0 or map_x >= map_w or map_y < 0 or map_y >= map_h:
+            return None, side
+        i = map_y * map_w + map_x
+        if cells[i]:
             perp_dist = (side_dist_x - delta_dist_x) if side == 0 else (side_dist_y - delta_dist_y)
-            if perp_dist < 0.1: perp_dist = 0.1
-            line_h = int(H / perp_dist)
-            draw_start = max(0, H//2 - line_h//2)
-            draw_end = min(H-1, H//2 + line_h//2)
+            return max(perp_dist, 0.1), side
+        if skip_t and distance[i] > 2:
+            # jump ahead, then restart the DDA from the cell we land in
+            t = (side_dist_x - delta_dist_x if side == 0 else side_dist_y - delta_dist_y) + (distance[i] - 1) * skip_t - 1e-9
+            map_x = int(pos_x + ray_dir_x * t)
+            map_y = int(pos_y + ray_dir_y * t)
+            side_dist_x = ((pos_x - map_x) if step_x < 0 else (map_x + 1.0 - pos_x)) * delta_dist_x
+            side_dist_y = ((pos_y - map_y) if step_y < 0 else (map_y + 1.0 - pos_y)) * delta_dist_y
+
+
+@lru_cache(maxsize=COLUMN_CACHE_SIZE)
+def column_strip(line_h, shade, side, H):
+    """One screen column, top to bottom: ceiling, wall, floor. line_h 0 is an empty column."""
+    strip = [CEILING] * (H//2) + [FLOOR] * (H - H//2)
+    draw_start = max(0, H//2 - line_h//2)
+    draw_end = min(H-1, H//2 + line_h//2)   # the last row is always floor
+    if draw_end > draw_start:
+        char = WALL_CHARS[shade]
+        if side: char = char.lower()
+        color = "\x1b[91m" if not side and shade < 6 else "\x1b[31m" if not side else "\x1b[90m"
+        strip[draw_start:draw_end] = [color + char + RESET] * (draw_end - draw_start)
+    return tuple(strip)
+
 
+def cast_rays(pos_x, pos_y, dir_x, dir_y, plane_x, plane_y, grid, W, H, zbuffer=None, profiler=NULL_PROFILER):
+    """Frame as rows of cells. `zbuffer` (list of W floats), if given, gets each column's wall distance.
+
+    Columns come from column_strip(), which depends only on (line height, shade,
+    side), so most of them are cache hits; the frame is built column by column
+    and transposed into rows at the end.
+    """
+    columns = []
+    max_h = 2 * H   # taller walls cover the whole column anyway
+    for x in range(W):
+        camera_x = 2 * x / W - 1
+        ray_dir_x = dir_x + plane_x * camera_x
+        ray_dir_y = dir_y + plane_y * camera_x
+        perp_dist, side = trace_ray(pos_x, pos_y, ray_dir_x, ray_dir_y, grid)
+
+        if zbuffer is not None:
+            zbuffer[x] = math.inf if perp_dist is None else perp_dist
+        if perp_dist is None:
+            columns.append(column_strip(0, 0, 0, H))
+        else:
+            line_h = min(int(H / perp_dist), max_h)
             shade = min(len(WALL_CHARS)-1, int(perp_dist))
-            char = WALL_CHARS[shade]
-            if side: char = char.lower()
+            columns.append(column_strip(line_h, shade, side, H))
 
-            color = "\x1b[91m" if not side and perp_dist < 6 else "\x1b[31m" if not side else "\x1b[90m"
-            reset = "\x1b[0m" if os.name != 'nt' else ""
+    profiler.mark("rays")
 
-            for y in range(draw_start, draw_end):
-                buffer[y][x] = color + char + reset
+    # Floor and ceiling come with the strips; turn columns into rows
+    buffer = [list(row) for row in zip(*columns)]
 
-    # FLoor and ceiling
-    for y in range(H):
-        for x in range(W):
-            if buffer[y][x] == " ":
-                buffer[y][x] = ("\x1b[44m \x1b[0m" if y < H//2 else "\x1b[42m \x1b[0m") if os.name != 'nt' else ("░" if y < H//2 else "▒")
+    profiler.mark("rows")
 
     # Weapon test
     # gun = ["   ▄███▄   ", "   ▀███▀   "]
@@ -135,67 +190,270 @@ def cast_rays():
 
     return buffer
 
+
+class Renderer:
+    """Turns a Camera into a frame buffer (rows of cell strings) with the chosen backend."""
+
+    def __init__(self, world_map=DEFAULT_MAP, w=W, h=H, backend="python", sprites=None, workers=None,
+                 profiler=NULL_PROFILER):
+        self.world_map = world_map
+        self.profiler = profiler
+        self.w, self.h = w, h
+        self.sprites = world_map.sprites if sprites is None else sprites
+        self.sprites_drawn = 0
+        self.pool = None
+        if backend == "numpy":
+            from doom_raycast import cast_rays_numpy
+            self.cast = cast_rays_numpy
+        elif backend == "parallel":
+            # worker processes sized for w columns; frames can get narrower, not wider
+            from doom_parallel import ParallelCaster
+            self.pool = ParallelCaster(world_map, w, workers)
+            self.cast = self.pool.cast
+        else:
+            # only the reference caster can tell ray stepping and the transpose apart
+            self.cast = lambda *args: cast_rays(*args, profiler=profiler)
+
+    def close(self):
+        if self.pool:
+            self.pool.close()
+            self.pool = None
+
+    def render(self, camera):
+        if not self.sprites:
+            buffer = self.cast(*camera.state(), self.world_map, self.w, self.h)
+            self.profiler.mark("rays")
+            return buffer
+        zbuffer = [0.0] * self.w
+        buffer = self.cast(*camera.state(), self.world_map, self.w, self.h, zbuffer)
+        self.profiler.mark("rays")
+        self.sprites_drawn = draw_sprites(buffer, zbuffer, camera.state(), self.sprites, MAX_DEPTH)
+        self.profiler.mark("sprites")
+        return buffer
+
+
+class ResolutionScaler:
+    """Picks the render resolution that holds the target FPS.
+
+    Tracks an average of the frame's work time (render + output). Over budget,
+    the resolution drops one step; well under budget, it goes back up one step.
+    The two thresholds are far enough apart that a step up does not land over
+    budget again (one step costs ~1/STEP^2 more), and the average restarts after
+    every change so each step is judged on its own frames.
+    """
+    STEP = 0.85
+    DOWN_AT = 0.9       # fraction of the frame budget
+    UP_AT = 0.5
+    SETTLE = 10         # frames averaged before deciding
+
+    def __init__(self, w, h, target_fps=TARGET_FPS, min_scale=0.25):
+        self.full_w, self.full_h = w, h
+        self.budget = 1.0 / target_fps
+        self.min_scale = min_scale
+        self.scale = 1.0
+        self._total = 0.0
+        self._frames = 0
+
+    def size(self):
+        return max(8, round(self.full_w * self.scale)), max(4, round(self.full_h * self.scale))
+
+    def update(self, work):
+        """Record one frame's work time; returns True when the resolution changed."""
+        self._total += work
+        self._frames += 1
+        if self._frames < self.SETTLE:
+            return False
+        average = self._total / self._frames
+        self._total, self._frames = 0.0, 0
+
+        old = self.size()
+        if average > self.budget * self.DOWN_AT:
+            self.scale = max(self.min_scale, self.scale * self.STEP)
+        elif average < self.budget * self.UP_AT:
+            self.scale = min(1.0, self.scale / self.STEP)
+        return self.size() != old
+
+
+# ================== Benchmark ==================
+def demo_path(frames, world_map=DEFAULT_MAP):
+    """Scripted camera walk for benchmarks: down the first corridor, then back, looking around."""
+    camera = Camera()
+    for i in range(frames):
+        t = i / 30
+        camera.rotate(0.05 * math.sin(t))
+        camera.move(world_map, MOVE_SPEED / 30 * math.cos(t / 4))
+        yield camera
+
+
+def benchmark(frames=300, w=W, h=H, backend="python", diff=True, workers=None, profiler=NULL_PROFILER):
+    """Render `frames` frames of demo_path into memory; returns frames per second."""
+    import io
+    out = io.StringIO()
+    renderer = Renderer(w=w, h=h, backend=backend, workers=workers, profiler=profiler)
+    screen_out = None
+    if diff:
+        from doom_screen import DiffRenderer
+        screen_out = DiffRenderer(out, profiler=profiler)
+
+    try:
+        start = time.perf_counter()
+        for camera in demo_path(frames):
+            profiler.begin()
+            screen = renderer.render(camera)
+            if screen_out:
+                screen_out.render(screen)
+            else:
+                data = "\x1b[H" + "\n".join("".join(row) for row in screen) + "\n"
+                profiler.mark("join")
+                out.write(data)
+                profiler.mark("write")
+            profiler.end()
+        return frames / (time.perf_counter() - start)
+    finally:
+        renderer.close()
+
+
 # ================== Main Process ==================
-print("ASCII DOOM | WASD + Q/E or arrows | ESC — exit")
-time.sleep(2)
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # vectorized NumPy raycaster: python mini_doom.py --numpy
+    # worker processes, one band of columns each: --parallel [workers]
+    backend = "numpy" if "--numpy" in argv else "parallel" if "--parallel" in argv else "python"
+    workers = None
+    if "--parallel" in argv:
+        i = argv.index("--parallel")
+        workers = int(argv[i + 1]) if i + 1 < len(argv) and argv[i + 1].isdigit() else None
 
-old_settings = None
-if os.name != 'nt':
-    old_settings = termios.tcgetattr(sys.stdin)
-    tty.setcbreak(sys.stdin.fileno())
+    if "--benchmark" in argv:
+        # headless: python mini_doom.py --benchmark [frames] [--numpy] [--full-redraw]
+        i = argv.index("--benchmark")
+        frames = int(argv[i + 1]) if i + 1 < len(argv) and argv[i + 1].isdigit() else 300
+        for w, h in ((W, H), (2 * W, 2 * H)):
+            profiler = FrameProfiler(window=frames) if "--profile" in argv else NULL_PROFILER
+            fps = benchmark(frames, w, h, backend, diff="--full-redraw" not in argv, workers=workers,
+                            profiler=profiler)
+            print(f"{w}x{h} {backend}: {fps:.1f} FPS over {frames} frames")
+            if profiler.enabled:
+                print(f"  {profiler.status()}")
+        return
 
-try:
-    dt = 0.033
-    while True:
-        key = get_key()
-
-        # Exit
-        if key in ('\x1b', '\x03'):  # ESC or Ctrl+C
-            break
-
-        # Looking around
-        rot = 0
-        if key in ('e', 'right'): rot = ROT_SPEED * dt
-        if key in ('q', 'left'):  rot = -ROT_SPEED * dt
-        if rot:
-            old_dir_x = dir_x
-            dir_x = dir_x * math.cos(rot) - dir_y * math.sin(rot)
-            dir_y = old_dir_x * math.sin(rot) + dir_y * math.cos(rot)
-            old_plane_x = plane_x
-            plane_x = plane_x * math.cos(rot) - plane_y * math.sin(rot)
-            plane_y = old_plane_x * math.sin(rot) + plane_y * math.cos(rot)
-
-        # Moving
-        move = 0
-        strafe = 0
-        if key in ('w', 'up'): move = MOVE_SPEED * dt
-        if key in ('s', 'down'): move = -MOVE_SPEED * dt
-        if key == 'a': strafe = -MOVE_SPEED * dt
-        if key == 'd': strafe = MOVE_SPEED * dt
-
-        # Check collisions
-        if move:
-            nx = pos_x + dir_x * move
-            ny = pos_y + dir_y * move
-            if world_map[int(pos_y)][int(nx)] == 0:  # X
-                pos_x = nx
-            if world_map[int(ny)][int(pos_x)] == 0:  # Y
-                pos_y = ny
+    # --map maze.txt: a text map (see doom_map), the built-in one otherwise
+    grid = GridMap.load(argv[argv.index("--map") + 1]) if "--map" in argv else DEFAULT_MAP
+    camera = Camera(*grid.start)
+    # --profile: phase timings on the last line; --profile-csv frames.csv also logs every frame
+    profiler = NULL_PROFILER
+    if "--profile" in argv or "--profile-csv" in argv:
+        csv_path = argv[argv.index("--profile-csv") + 1] if "--profile-csv" in argv else None
+        profiler = FrameProfiler(csv_path=csv_path)
+    # picked-up sprites are removed from this copy, not from the map
+    renderer = Renderer(grid, backend=backend, sprites=list(grid.sprites), workers=workers, profiler=profiler)
+    picked = {"health": 0, "ammo": 0}
+    # --fps N sets the target, --fixed-resolution keeps W x H whatever it costs
+    target_fps = int(argv[argv.index("--fps") + 1]) if "--fps" in argv else TARGET_FPS
+    scaler = None if "--fixed-resolution" in argv else ResolutionScaler(W, H, target_fps)
 
-        if strafe:
-            nx = pos_x + dir_y * strafe
-            ny = pos_y - dir_x * strafe
-            if world_map[int(ny)][int(nx)] == 0:
-                pos_x, pos_y = nx, ny
-
-
-        # Drawing
-        screen = cast_rays()
-        print("\x1b[H" + "\n".join("".join(row) for row in screen))
-        time.sleep(max(0, dt - 0.005))
-
-finally:
-    if os.name != 'nt' and old_settings:
-        termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
-        sys.stdout.write("\x1b[?25h\x1b[0m")
-    print("\n\n..")
\ No newline at end of file
+    # only changed cells are sent to the terminal; --full-redraw prints every frame whole
+    screen_out = None
+    if "--full-redraw" not in argv:
+        from doom_screen import DiffRenderer
+        screen_out = DiffRenderer(profiler=profiler)
+
+    # --log frames.csv: one row per frame to check pacing
+    log_file = log = None
+    if "--log" in argv:
+        import csv
+        log_file = open(argv[argv.index("--log") + 1], "w", newline="")
+        log = csv.writer(log_file)
+        log.writerow(["frame", "time", "dt_ms", "work_ms", "render_w", "render_h"])
+
+    if os.name == 'nt':
+        os.system('cls')
+        os.system(f'mode con: cols={W} lines={H+3}')
+    else:
+        os.system('clear')
+        sys.stdout.write(f"\x1b[8;{H+3};{W}t\x1b[?25l")
+
+    print("ASCII DOOM | WASD + Q/E or arrows | ESC — exit")
+    time.sleep(2)
+
+    old_settings = None
+    if os.name != 'nt':
+        old_settings = termios.tcgetattr(sys.stdin)
+        tty.setcbreak(sys.stdin.fileno())
+
+    from doom_screen import upscale
+
+    keys = Keyboard()
+    try:
+        frame = 0
+        started = last = time.perf_counter()
+        while True:
+            now = time.perf_counter()
+            dt = min(now - last, MAX_DT)
+            last = now
+            pressed = keys.poll(now)
+
+            # Exit
+            if 'esc' in pressed or 'ctrl-c' in pressed:
+                break
+
+            # Looking around
+            if keys.held('e', 'right'): camera.rotate(ROT_SPEED * dt)
+            if keys.held('q', 'left'):  camera.rotate(-ROT_SPEED * dt)
+
+            # Moving (collisions are checked by the camera)
+            move = 0
+            strafe = 0
+            if keys.held('w', 'up'): move += MOVE_SPEED * dt
+            if keys.held('s', 'down'): move -= MOVE_SPEED * dt
+            if keys.held('a'): strafe -= MOVE_SPEED * dt
+            if keys.held('d'): strafe += MOVE_SPEED * dt
+            camera.move(renderer.world_map, move, strafe)
+            for kind in collect_pickups(renderer.sprites, camera.x, camera.y):
+                picked[kind] += 1
+
+            # Drawing: at the scaler's resolution, stretched back to W x H
+            profiler.begin()
+            screen = upscale(renderer.render(camera), W, H)
+            if screen_out:
+                screen_out.render(screen)
+                frame_ms = (time.perf_counter() - now) * 1000
+                sys.stdout.write(f"\x1b[{H + 1};1H\x1b[2K{screen_out.status()} | frame {frame_ms:5.1f} ms"
+                                 f" | {renderer.w}x{renderer.h} @ {1 / dt if dt else 0:4.0f} FPS"
+                                 f"\x1b[{H + 2};1H\x1b[2Khealth {picked['health']}  ammo {picked['ammo']}"
+                                 f"  sprites in view {renderer.sprites_drawn}")
+                if profiler.enabled:
+                    sys.stdout.write(f"\x1b[{H + 3};1H\x1b[2K{profiler.status()}")
+                sys.stdout.flush()
+                profiler.mark("write")     # the status lines are terminal output too
+            else:
+                data = "\x1b[H" + "\n".join("".join(row) for row in screen)
+                profiler.mark("join")
+                print(data)
+                profiler.mark("write")
+            profiler.end()
+
+            work = time.perf_counter() - now
+            if log:
+                log.writerow([frame, f"{now - started:.4f}", f"{dt * 1000:.2f}", f"{work * 1000:.2f}",
+                              renderer.w, renderer.h])
+            if scaler and scaler.update(work):
+                renderer.w, renderer.h = scaler.size()
+            frame += 1
+
+            # sleep off the rest of the frame budget
+            time.sleep(max(0.0, 1 / target_fps - (time.perf_counter() - now)))
+
+    finally:
+        renderer.close()
+        profiler.close()
+        if log_file:
+            log_file.close()
+        if os.name != 'nt' and old_settings:
+            termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
+            sys.stdout.write("\x1b[?25h\x1b[0m")
+        print("\n\n..")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Play a Wordle strategy against every secret and report how it does.
+
+A strategy is a callable strategy(table) that returns a fresh player for
+one game. The player needs suggest() -> word and update(guess, code). It
+is built once per game. STRATEGIES names the built-in ones. Any picklable
+callable works as well, e.g. a functools.partial of your own class.
+
+The secrets are split into chunks and played on a process pool. The
+workers do not receive the feedback matrix through a pipe. It is saved in
+.wordle_cache/ first, and every worker memory-maps that same file, so all
+processes share one copy through the page cache. Per secret, only the
+number of guesses comes back.
+
+    python wordle_eval.py [strategy ...] [--workers N] [--max-guesses N]
+"""
+import functools
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from wordle_feedback import FeedbackMatrix
+from wordle_solver import Solver, solve
+
+CHUNK = 16      # secrets per task
+
+
+class RandomCandidate:
+    """Baseline: guess a random word that could still be the answer."""
+
+    def __init__(self, table, seed=0):
+        self.table = table
+        self.rng = random.Random(seed)
+        self.candidates = np.arange(len(table.answers))
+
+    def suggest(self):
+        return self.table.answers[self.rng.choice(self.candidates)]
+
+    def update(self, guess, code):
+        row = self.table.matrix[self.table.guess_index[guess]]
+        self.candidates = self.candidates[row[self.candidates] == code]
+
+
+STRATEGIES = {
+    "entropy": Solver,
+    "entropy-hard": functools.partial(Solver, hard_mode=True),
+    "answers-only": functools.partial(Solver, answers_only=True),
+    "random": RandomCandidate,
+}
+
+_table = None   # per worker process
+
+
+def _init_worker(guesses, answers, path):
+    global _table
+    _table = FeedbackMatrix(guesses, answers, np.load(path, mmap_mode="r"))
+
+
+def _play_chunk(strategy, secrets, max_guesses):
+    """Guess counts for a chunk of secret indices; 0 means not solved."""
+    counts = []
+    for ai in secrets:
+        secret = _table.answers[ai]
+        guesses = solve(_table, secret, max_guesses, strategy=strategy)
+        counts.append(len(guesses) if guesses[-1] == secret else 0)
+    return counts
+
+
+class Report:
+    def __init__(self, name, counts, max_guesses, elapsed):
+        self.name = name
+        self.counts = counts
+        self.max_guesses = max_guesses
+        self.elapsed = elapsed
+
+    @property
+    def games(self):
+        return len(self.counts)
+
+    def distribution(self):
+        """{guesses: games} for 1..max_guesses, and "X" for failures."""
+        dist = {n: 0 for n in range(1, self.max_guesses + 1)}
+        dist["X"] = 0
+        for n in self.counts:
+            dist[n or "X"] += 1
+        return dist
+
+    @property
+    def average(self):
+        solved = [n for n in self.counts if n]
+        return sum(solved) / len(solved) if solved else float("nan")
+
+    @property
+    def failure_rate(self):
+        return self.counts.count(0) / self.games if self.games else 0.0
+
+    def __str__(self):
+        dist = self.distribution()
+        widest = max(dist.values()) or 1
+        lines = [f"{self.name}: {self.games} games, {self.average:.3f} guesses on average, "
+                 f"{self.failure_rate:.2%} failed, {self.games / self.elapsed:.0f} games/s"]
+        for n, games in dist.items():
+            lines.append(f"  {n}: {'#' * round(30 * games / widest):<30} {games}")
+        return "\n".join(lines)
+
+
+def evaluate(strategy, table, workers=None, max_guesses=6, name=None):
+    """Play `strategy` against every answer in `table` on `workers` processes."""
+    if table.path is None:
+        table = FeedbackMatrix.build(table.guesses, table.answers)  # workers need the file
+    # compute the cached opener once here instead of in every worker
+    solve(table, table.answers[0], 1, strategy=strategy)
+
+    chunks = [range(i, min(i + CHUNK, len(table.answers))) for i in range(0, len(table.answers), CHUNK)]
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker(table.guesses, table.answers, table.path)
+        results = [_play_chunk(strategy, chunk, max_guesses) for chunk in chunks]
+    else:
+        with mp.Pool(workers, _init_worker, (table.guesses, table.answers, table.path)) as pool:
+            results = pool.starmap(_play_chunk, [(strategy, chunk, max_guesses) for chunk in chunks])
+    elapsed = time.perf_counter() - start
+    counts = [n for chunk in results for n in chunk]
+    return Report(name or getattr(strategy, "__name__", repr(strategy)), counts, max_guesses, elapsed)
+
+
+def main(argv):
+    from Wordle import WORDS
+
+    workers = max_guesses = None
+    names = []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--workers":
+            workers = int(next(args))
+        elif arg == "--max-guesses":
+            max_guesses = int(next(args))
+        elif arg in STRATEGIES:
+            names.append(arg)
+        else:
+            print(f"unknown strategy {arg!r}; choose from {', '.join(STRATEGIES)}")
+            return 2
+
+    words = sorted(set(WORDS))
+    table = FeedbackMatrix.build(words)
+    print(f"{len(words)} secrets, {workers or os.cpu_count()} worker(s)")
+    for name in names or STRATEGIES:
+        print(evaluate(STRATEGIES[name], table, workers, max_guesses or 6, name))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
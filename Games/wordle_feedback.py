@@ -0,0 +1,148 @@
+"""Precomputed Wordle feedback.
+
+The colors compare_words() gives a guess are encoded as one number, the
+pattern code: gray 0, yellow 1, green 2 for each letter, letter i
+weighted 3**i. That gives 0..242, and 242 means all green. encode() and
+colors() in wordle_index convert between the two; they need no NumPy.
+
+FeedbackMatrix holds the code for every (guess, answer) pair as a uint8
+NumPy matrix, so a solver looks feedback up instead of recomputing it.
+The matrix is computed with array operations, a block of guesses at a
+time. It is saved to .wordle_cache/ under a name derived from the word
+lists, and memory-mapped on later runs.
+
+Repeated letters follow compare_words: greens are taken first. A
+non-green guess letter is then yellow when the secret has more non-green
+copies of it than there are earlier non-green copies in the guess.
+
+Run this file to build the matrix for Wordle.WORDS and check every pair
+against compare_words.
+"""
+import hashlib
+import os
+
+import numpy as np
+
+from wordle_index import COLOR_NAMES, colors, encode
+
+GREEN_ALL = 242
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".wordle_cache")
+BLOCK = 512     # guesses per block: BLOCK x answers x 5 booleans at a time
+
+
+def letters(words):
+    """Words as an (n, 5) uint8 array of letter numbers 0-25."""
+    return np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8).reshape(-1, 5) - ord("a")
+
+
+def pattern_codes(guesses, answers):
+    """(len(guesses), len(answers)) uint8 matrix of pattern codes."""
+    g_all, a = letters(guesses), letters(answers)
+    out = np.empty((len(guesses), len(answers)), dtype=np.uint8)
+    a = a[None, :, :]
+    for start in range(0, len(guesses), BLOCK):
+        g = g_all[start:start + BLOCK][:, None, :]
+        green = g == a                                  # (block, answers, 5)
+        code = np.zeros(green.shape[:2], dtype=np.uint8)
+        for i in range(5):
+            # non-green copies of guess letter i in the secret ...
+            available = np.zeros(code.shape, dtype=np.uint8)
+            for m in range(5):
+                available += (a[:, :, m] == g[:, :, i]) & ~green[:, :, m]
+            # ... minus the non-green copies earlier in the guess
+            used = np.zeros(code.shape, dtype=np.uint8)
+            for j in range(i):
+                used += (g[:, :, j] == g[:, :, i]) & ~green[:, :, j]
+            yellow = ~green[:, :, i] & (available > used)
+            code += 3 ** i * (2 * green[:, :, i] + yellow).astype(np.uint8)
+        out[start:start + BLOCK] = code
+    return out
+
+
+class FeedbackMatrix:
+    def __init__(self, guesses, answers, matrix):
+        self.guesses = list(guesses)
+        self.answers = list(answers)
+        self.matrix = matrix
+        self.guess_index = {w: i for i, w in enumerate(self.guesses)}
+        self.answer_index = {w: i for i, w in enumerate(self.answers)}
+
+    @classmethod
+    def build(cls, guesses, answers=None, cache_dir=CACHE_DIR):
+        """Matrix for these word lists: memory-mapped from the cache, or computed and cached."""
+        answers = guesses if answers is None else answers
+        key = hashlib.sha1(("\n".join(guesses) + "|" + "\n".join(answers)).encode()).hexdigest()[:16]
+        path = os.path.join(cache_dir, f"patterns-{len(guesses)}x{len(answers)}-{key}.npy") if cache_dir else None
+        if path and os.path.exists(path):
+            return cls(guesses, answers, np.load(path, mmap_mode="r"))
+
+        matrix = pattern_codes(guesses, answers)
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = path + f".{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, matrix)
+            os.replace(tmp, path)   # never leave a half-written cache behind
+        return cls(guesses, answers, matrix)
+
+    @property
+    def path(self):
+        return getattr(self.matrix, "filename", None)
+
+    def pattern(self, guess, secret):
+        return int(self.matrix[self.guess_index[guess], self.answer_index[secret]])
+
+
+def verify(table, compare_words):
+    """Compare every pair in `table` with compare_words(); returns the mismatches."""
+    bad = []
+    for gi, guess in enumerate(table.guesses):
+        row = table.matrix[gi]
+        for ai, secret in enumerate(table.answers):
+            if row[ai] != encode(compare_words(secret, guess)):
+                bad.append((guess, secret))
+    return bad
+
+
+def _self_check():
+    import time
+
+    from Wordle import WORDS, compare_words
+
+    words = sorted(set(WORDS))
+    # repeated letters are where the rules get subtle
+    tricky = ["speed", "spell", "sheep", "geese", "eerie", "level", "abbey", "mamma", "llama", "allay"]
+    guesses = sorted(set(words + tricky))
+
+    start = time.perf_counter()
+    table = FeedbackMatrix.build(guesses, words, cache_dir=None)
+    built = time.perf_counter() - start
+    bad = verify(table, compare_words)
+    print(f"{len(guesses)}x{len(words)} matrix in {built * 1000:.1f} ms, "
+          f"{len(guesses) * len(words) - len(bad)}/{len(guesses) * len(words)} pairs match compare_words")
+    for guess, secret in bad[:5]:
+        print(f"  {guess} vs {secret}: {[COLOR_NAMES[c] for c in colors(table.pattern(guess, secret))]} != "
+              f"{[c for c, _ in compare_words(secret, guess)]}")
+    assert all(encode([(COLOR_NAMES[c], "x") for c in colors(code)]) == code for code in range(243))
+
+    # cache round trip
+    FeedbackMatrix.build(guesses, words)
+    start = time.perf_counter()
+    cached = FeedbackMatrix.build(guesses, words)
+    print(f"cached at {cached.path}, memory-mapped in {(time.perf_counter() - start) * 1000:.1f} ms")
+    assert np.array_equal(cached.matrix, table.matrix)
+
+    # a 13k x 2.3k sized problem, from random letters
+    rng = np.random.default_rng(1)
+    big = ["".join(chr(97 + c) for c in row) for row in rng.integers(0, 26, (13000, 5))]
+    start = time.perf_counter()
+    matrix = pattern_codes(big, big[:2300])
+    print(f"13000x2300 matrix in {time.perf_counter() - start:.2f} s")
+    sample = rng.integers(0, (13000, 2300), (20000, 2))
+    sample_ok = all(matrix[g, a] == encode(compare_words(big[a], big[g])) for g, a in sample)
+    print(f"random letter pairs match compare_words: {sample_ok}")
+    return not bad and sample_ok
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if _self_check() else 1)
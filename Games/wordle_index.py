@@ -0,0 +1,167 @@
+"""Bitset index for narrowing Wordle candidates.
+
+Each set of words is a bitset, one bit per word in the lexicon, packed into
+uint64 blocks. The index precomputes two families of them:
+
+    position[i, L]   words with letter L at position i
+    at_least[L, k]   words with at least k copies of L (k = 0..6)
+
+The feedback for a guess (compare_words rules) turns into ANDs of those:
+
+    green  at i     position[i, L]
+    yellow/gray i   NOT position[i, L]
+    letter L        at_least[L, n], where n counts the guess's green and
+                    yellow copies of L; if some copy of L is gray, the
+                    secret has exactly n copies, so also NOT at_least[L, n + 1]
+
+That is exact: compare_words marks the non-green copies yellow from left
+to right while the secret has unmatched copies left, so a gray copy of a
+letter means the secret has no copies beyond the colored ones. One
+update is a dozen ANDs over len(words) / 64 integers, a few microseconds.
+
+Knowledge collects the hints themselves, for hard mode: every green must
+stay in place and every yellow must be used again.
+"""
+try:
+    import numpy as np
+except ImportError:  # Knowledge still works; CandidateIndex needs numpy
+    np = None
+
+ORDINALS = ("1st", "2nd", "3rd", "4th", "5th")
+COLOR_NAMES = ("gray", "yellow", "green")
+
+
+def encode(result):
+    """Pattern code of a compare_words() result: gray 0, yellow 1, green 2, letter i weighted 3**i."""
+    return sum(COLOR_NAMES.index(color) * 3 ** i for i, (color, _) in enumerate(result))
+
+
+def colors(code):
+    """Per-letter colors of a pattern code: 0 gray, 1 yellow, 2 green."""
+    return [code // 3 ** i % 3 for i in range(5)]
+
+
+def letter_counts(guess, code):
+    """{letter: (colored copies, any copy gray)} for a guess and its feedback."""
+    counts = {}
+    for letter, color in zip(guess, colors(code)):
+        n, gray = counts.get(letter, (0, False))
+        counts[letter] = (n + (color > 0), gray or color == 0)
+    return counts
+
+
+class CandidateIndex:
+    def __init__(self, words):
+        if np is None:
+            raise ImportError("CandidateIndex needs numpy")
+        self.words = list(words)
+        n = len(self.words)
+        self.blocks = (n + 63) // 64
+        codes = np.frombuffer("".join(self.words).encode("ascii"), dtype=np.uint8).reshape(n, 5) - ord("a")
+
+        self.position = np.zeros((5, 26, self.blocks), dtype=np.uint64)
+        for i in range(5):
+            for letter in range(26):
+                self.position[i, letter] = self._pack(codes[:, i] == letter)
+        self.at_least = np.zeros((26, 7, self.blocks), dtype=np.uint64)
+        for letter in range(26):
+            copies = (codes == letter).sum(axis=1)
+            for k in range(7):
+                self.at_least[letter, k] = self._pack(copies >= k)
+        self._all = self.at_least[0, 0].copy()
+
+    def _pack(self, flags):
+        """Bool per word -> bitset (bit j of block b is word 64 * b + j)."""
+        padded = np.zeros(self.blocks * 64, dtype=bool)
+        padded[:len(flags)] = flags
+        return np.packbits(padded.reshape(-1, 8), axis=1, bitorder="little").ravel().view(np.uint64)
+
+    def all(self):
+        """A fresh bitset of every word."""
+        return self._all.copy()
+
+    def narrow(self, mask, guess, code):
+        """AND `mask` in place with the words that give `code` for `guess`; returns it."""
+        for i, (letter, color) in enumerate(zip(guess, colors(code))):
+            row = self.position[i, ord(letter) - 97]
+            if color == 2:
+                mask &= row
+            else:
+                mask &= ~row
+        for letter, (n, gray) in letter_counts(guess, code).items():
+            rows = self.at_least[ord(letter) - 97]
+            mask &= rows[n]
+            if gray:
+                mask &= ~rows[n + 1]
+        return mask
+
+    def count(self, mask):
+        if hasattr(np, "bitwise_count"):
+            return int(np.bitwise_count(mask).sum())
+        return int(np.unpackbits(mask.view(np.uint8)).sum())
+
+    def members(self, mask):
+        flags = np.unpackbits(mask.view(np.uint8), bitorder="little")[:len(self.words)]
+        return [self.words[i] for i in np.flatnonzero(flags)]
+
+
+class Knowledge:
+    """The hints revealed so far: greens by position and the minimum count of each letter."""
+
+    def __init__(self):
+        self.greens = {}
+        self.minimum = {}
+
+    def add(self, guess, code):
+        for i, (letter, color) in enumerate(zip(guess, colors(code))):
+            if color == 2:
+                self.greens[i] = letter
+        for letter, (n, _) in letter_counts(guess, code).items():
+            self.minimum[letter] = max(self.minimum.get(letter, 0), n)
+
+    def hard_mode_error(self, guess):
+        """Why `guess` breaks hard mode, or None if it uses every hint."""
+        for i, letter in sorted(self.greens.items()):
+            if guess[i] != letter:
+                return f"{ORDINALS[i]} letter must be {letter.upper()}"
+        for letter, n in sorted(self.minimum.items()):
+            if guess.count(letter) < n:
+                return f"Guess must contain {letter.upper()}" + (f" {n} times" if n > 1 else "")
+        return None
+
+
+def _self_check():
+    import random
+    import time
+
+    from Wordle import WORDS, compare_words
+
+    words = sorted(set(WORDS) | {"speed", "spell", "sheep", "geese", "eerie", "level", "llama"})
+    index = CandidateIndex(words)
+    rng = random.Random(4)
+    checks = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    for _ in range(300):
+        secret = rng.choice(words)
+        mask = index.all()
+        expected = set(words)
+        for guess in rng.sample(words, 3):
+            code = encode(compare_words(secret, guess))
+            t = time.perf_counter()
+            index.narrow(mask, guess, code)
+            elapsed += time.perf_counter() - t
+            expected = {w for w in expected if encode(compare_words(w, guess)) == code}
+            assert set(index.members(mask)) == expected, (secret, guess)
+            assert index.count(mask) == len(expected)
+            checks += 1
+    print(f"{checks} updates match compare_words filtering, {elapsed / checks * 1e6:.1f} us per update "
+          f"over {len(words)} words ({time.perf_counter() - start:.2f} s with checks)")
+
+    knowledge = Knowledge()
+    knowledge.add("speed", encode(compare_words("eerie", "speed")))
+    print("after SPEED vs EERIE:", knowledge.hard_mode_error("slate"), "/", knowledge.hard_mode_error("sheep"))
+
+
+if __name__ == "__main__":
+    _self_check()
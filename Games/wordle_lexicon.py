@@ -0,0 +1,190 @@
+"""Word lists for Wordle: the possible answers and the allowed guesses.
+
+Lists are plain text files with one word per line. Blank lines and lines
+starting with # are skipped, and words are lowercased. Anything that is
+not five letters a-z is dropped, and duplicates are removed. Every answer
+is also an allowed guess.
+
+Each word packs into a number, its letters read as base-26 digits
+(0 .. 26**5 - 1). The allowed guesses are kept as a bitmap over all those
+numbers, 1.5 MB. So `word in lexicon` is one byte lookup, whatever the
+size of the list.
+
+Loading the files once writes a binary index to .wordle_cache/: the
+packed answers, the packed allowed words and the bitmap. Later starts
+read that file instead of parsing and sorting the text again. The index
+name includes the paths, sizes and modification times of the source
+files, so an edited list gets a new index.
+"""
+import hashlib
+import os
+import struct
+from array import array
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".wordle_cache")
+CODES = 26 ** 5
+MAGIC = b"WLX1"
+HEADER = struct.Struct("<4sII")     # magic, answers, allowed
+
+
+def pack(word):
+    """Base-26 number of a lowercase five-letter word."""
+    code = 0
+    for ch in word:
+        code = code * 26 + ord(ch) - 97
+    return code
+
+
+def unpack(code):
+    letters = []
+    for _ in range(5):
+        code, rem = divmod(code, 26)
+        letters.append(chr(97 + rem))
+    return "".join(reversed(letters))
+
+
+def is_word(word):
+    return len(word) == 5 and word.isascii() and word.isalpha() and word.islower()
+
+
+def read_words(path):
+    """The valid five-letter words in a list file, in file order, without duplicates."""
+    with open(path, encoding="utf-8") as f:
+        words = (line.strip().lower() for line in f if not line.startswith("#"))
+        return list(dict.fromkeys(w for w in words if is_word(w)))
+
+
+class Lexicon:
+    def __init__(self, answers, allowed=(), bitmap=None):
+        """`answers` and `allowed` are packed codes, or words. Both are deduplicated and sorted."""
+        answers = sorted({pack(w) if isinstance(w, str) else w for w in answers})
+        allowed = sorted({pack(w) if isinstance(w, str) else w for w in allowed}.union(answers))
+        self._answer_codes = array("I", answers)
+        self._allowed_codes = array("I", allowed)
+        if bitmap is None:
+            bitmap = bytearray((CODES + 7) // 8)
+            for code in allowed:
+                bitmap[code >> 3] |= 1 << (code & 7)
+        self.bitmap = bitmap
+        self._answers = self._allowed = None
+
+    @classmethod
+    def load(cls, answers_path, allowed_path=None, cache_dir=CACHE_DIR, default_answers=()):
+        """Lexicon from list files, through the binary index in `cache_dir` when there is one.
+
+        Without `answers_path` the answers are the words in `default_answers`.
+        """
+        sources = [p for p in (answers_path, allowed_path) if p]
+        stamp = "|".join(f"{os.path.abspath(p)}:{os.stat(p).st_size}:{os.stat(p).st_mtime_ns}" for p in sources)
+        if not answers_path:
+            stamp += "|" + ",".join(default_answers)
+        path = None
+        if cache_dir:
+            key = hashlib.sha1(stamp.encode()).hexdigest()[:16]
+            path = os.path.join(cache_dir, f"lexicon-{key}.bin")
+            if os.path.exists(path):
+                return cls.read_index(path)
+
+        answers = read_words(answers_path) if answers_path else default_answers
+        lexicon = cls(answers, read_words(allowed_path) if allowed_path else ())
+        if path:
+            lexicon.write_index(path)
+        return lexicon
+
+    def write_index(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + f".{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(self._answer_codes), len(self._allowed_codes)))
+            self._answer_codes.tofile(f)
+            self._allowed_codes.tofile(f)
+            f.write(self.bitmap)
+        os.replace(tmp, path)
+
+    @classmethod
+    def read_index(cls, path):
+        with open(path, "rb") as f:
+            magic, n_answers, n_allowed = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a lexicon index")
+            answers, allowed = array("I"), array("I")
+            answers.fromfile(f, n_answers)
+            allowed.fromfile(f, n_allowed)
+            bitmap = f.read()
+        # the index is already deduplicated and sorted; skip the constructor's work
+        lexicon = cls.__new__(cls)
+        lexicon._answer_codes, lexicon._allowed_codes = answers, allowed
+        lexicon.bitmap = bitmap
+        lexicon._answers = lexicon._allowed = None
+        return lexicon
+
+    def __contains__(self, word):
+        if not is_word(word):
+            return False
+        code = pack(word)
+        return bool(self.bitmap[code >> 3] >> (code & 7) & 1)
+
+    def __len__(self):
+        return len(self._allowed_codes)
+
+    @property
+    def answers(self):
+        """Sorted answer words (unpacked on first use)."""
+        if self._answers is None:
+            self._answers = [unpack(c) for c in self._answer_codes]
+        return self._answers
+
+    @property
+    def allowed(self):
+        """Sorted allowed guesses, answers included."""
+        if self._allowed is None:
+            self._allowed = [unpack(c) for c in self._allowed_codes]
+        return self._allowed
+
+
+def _benchmark():
+    import random
+    import tempfile
+    import time
+
+    from Wordle import WORDS
+
+    rng = random.Random(3)
+    fake = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(5)) for _ in range(13000)]
+    with tempfile.TemporaryDirectory() as tmp:
+        answers_path = os.path.join(tmp, "answers.txt")
+        allowed_path = os.path.join(tmp, "allowed.txt")
+        with open(answers_path, "w") as f:
+            f.write("# answers\n" + "\n".join(WORDS + WORDS[:20] + ["Crane", "toolong", ""]) + "\n")
+        with open(allowed_path, "w") as f:
+            f.write("\n".join(fake) + "\n")
+
+        start = time.perf_counter()
+        parsed = Lexicon.load(answers_path, allowed_path, cache_dir=tmp)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        cached = Lexicon.load(answers_path, allowed_path, cache_dir=tmp)
+        second = time.perf_counter() - start
+        print(f"{len(parsed.answers)} answers, {len(parsed)} allowed: "
+              f"parsed in {first * 1000:.1f} ms, from the index in {second * 1000:.1f} ms")
+        assert cached.answers == parsed.answers == sorted(set(WORDS) | {"crane"})
+        assert cached.allowed == parsed.allowed == sorted(set(fake) | set(parsed.answers))
+
+        # --allowed alone: the built-in answers, indexed the same way
+        extra = [Lexicon.load(None, allowed_path, cache_dir=tmp, default_answers=WORDS) for _ in range(2)]
+        assert extra[0].answers == extra[1].answers == sorted(set(WORDS))
+        assert extra[1].allowed == sorted(set(fake) | set(WORDS))
+        print(f"allowed list on the built-in answers: {len(extra[1])} allowed, "
+              f"{sum(name.startswith('lexicon-') for name in os.listdir(tmp))} indexes written")
+
+        probes = [rng.choice(parsed.allowed) for _ in range(50000)] + ["zzzzq", "hatey", "Crane", "abc"] * 10
+        start = time.perf_counter()
+        hits = sum(w in cached for w in probes)
+        per = (time.perf_counter() - start) / len(probes)
+        expected = set(parsed.allowed)
+        assert all((w in cached) == (w in expected) for w in probes)
+        print(f"{hits}/{len(probes)} probes valid, {per * 1e6:.2f} us per lookup")
+
+
+if __name__ == "__main__":
+    _benchmark()
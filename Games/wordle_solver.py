@@ -0,0 +1,245 @@
+"""Entropy-maximizing Wordle solver.
+
+The solver keeps the answers that are still possible. For every guess in
+its pool it counts how those candidates split over the 243 feedback
+patterns, and it suggests the guess whose split carries the most
+information:
+
+    H = log2(n) - sum(k * log2(k)) / n      over the bucket sizes k
+
+The counts for all pool guesses come from one np.bincount over the
+(guess, candidate) slice of the feedback matrix. Each guess row is offset
+by 243 so the buckets of different guesses do not mix. Ties go to guesses
+that could be the answer themselves.
+
+Options:
+    hard_mode     only suggest guesses that are consistent with every
+                  feedback so far (they could still be the answer)
+    answers_only  only suggest words from the answer list
+
+The first suggestion depends only on the word lists and the options, so
+it is cached in .wordle_cache/ next to the feedback matrix.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from wordle_feedback import CACHE_DIR, GREEN_ALL, FeedbackMatrix, pattern_codes
+
+BUCKETS = 243
+CHUNK = 2_000_000   # guess x candidate cells scored at a time
+
+
+def row(table, guess):
+    """Pattern codes of `guess` against every answer, also for words outside the guess list."""
+    gi = table.guess_index.get(guess)
+    if gi is not None:
+        return table.matrix[gi]
+    return pattern_codes([guess], table.answers)[0]
+
+
+def feedback(table, guess, secret):
+    return int(row(table, guess)[table.answer_index[secret]])
+
+
+def information(table, pool, candidate_sets):
+    """Expected information (bits) of every guess in `pool`, summed over several boards.
+
+    Each board is an array of the answers still possible on it. All boards
+    are counted in the same bincount: candidate columns of board b go to
+    buckets b * 243 .. b * 243 + 242, so one guess row spans len(boards) * 243 buckets.
+    """
+    boards = [c for c in candidate_sets if len(c) > 1]     # solved boards gain nothing
+    if not boards:
+        return np.zeros(len(pool))
+    sizes = np.array([len(c) for c in boards])
+    columns = np.concatenate(boards)
+    board_offset = np.repeat(np.arange(len(boards), dtype=np.int32) * BUCKETS, sizes)
+    span = len(boards) * BUCKETS
+    k = np.arange(sizes.max() + 1, dtype=np.float64)
+    k_log_k = k * np.log2(np.maximum(k, 1))     # bucket size -> k * log2(k)
+
+    out = np.empty(len(pool))
+    step = max(1, CHUNK // len(columns))
+    for start in range(0, len(pool), step):
+        rows = pool[start:start + step]
+        # gather only the (guess, candidate) cells, never whole matrix rows
+        codes = table.matrix[np.ix_(rows, columns)].astype(np.int32)
+        codes += board_offset
+        codes += (np.arange(len(rows), dtype=np.int32) * span)[:, None]
+        counts = np.bincount(codes.ravel(), minlength=len(rows) * span)
+        weighted = k_log_k[counts].reshape(len(rows), len(boards), BUCKETS).sum(axis=2)
+        out[start:start + step] = (weighted / sizes).sum(axis=1)
+    return np.log2(sizes).sum() - out
+
+
+def suggest_boards(solvers):
+    """Best guess for several boards played at once, one Solver per unsolved board.
+
+    A board down to one word is finished off first; otherwise the guess
+    with the most information summed over all boards wins.
+    """
+    solvers = [s for s in solvers if len(s.candidates)]
+    if not solvers:
+        return None
+    first = solvers[0]
+    if not any(s.history for s in solvers):
+        return first.suggest()      # every board is the same at the start: the cached opener
+    for solver in sorted(solvers, key=lambda s: len(s.candidates)):
+        if len(solver.candidates) == 1:
+            return solver.table.answers[solver.candidates[0]]
+    candidates = [s.candidates for s in solvers]
+    scores = information(first.table, first.pool, candidates)
+    possible = np.isin(first._answer_of[first.pool], np.concatenate(candidates))
+    return first.table.guesses[first.pool[np.argmax(scores + 1e-6 * possible)]]
+
+
+class Solver:
+    def __init__(self, table, hard_mode=False, answers_only=False, cache_dir=CACHE_DIR):
+        self.table = table
+        self.hard_mode = hard_mode
+        self.answers_only = answers_only
+        self.cache_dir = cache_dir
+        self.candidates = np.arange(len(table.answers))
+        if answers_only:
+            pool = [table.guess_index[w] for w in table.answers if w in table.guess_index]
+            self.pool = np.array(sorted(pool), dtype=np.int64)
+        else:
+            self.pool = np.arange(len(table.guesses))
+        self.history = []
+        # guess index -> answer index, for the "could be the answer" tie-break
+        answer_of = np.full(len(table.guesses), -1)
+        for w, ai in table.answer_index.items():
+            if w in table.guess_index:
+                answer_of[table.guess_index[w]] = ai
+        self._answer_of = answer_of
+
+    def row(self, guess):
+        return row(self.table, guess)
+
+    def update(self, guess, code):
+        """Narrow the candidates (and, in hard mode, the pool) with the feedback for `guess`."""
+        self.history.append((guess, code))
+        self.candidates = self.candidates[self.row(guess)[self.candidates] == code]
+        if self.hard_mode:
+            pool_words = [self.table.guesses[i] for i in self.pool]
+            consistent = pattern_codes([guess], pool_words)[0] == code
+            self.pool = self.pool[consistent]
+
+    def remaining(self):
+        return [self.table.answers[i] for i in self.candidates]
+
+    def scores(self):
+        """Expected information (bits) of every guess in the pool over the current candidates."""
+        return information(self.table, self.pool, [self.candidates])
+
+    def suggest(self):
+        if len(self.candidates) == 0:
+            return None
+        if len(self.candidates) <= 2:
+            return self.table.answers[self.candidates[0]]
+        if not self.history:
+            opener = self._cached_opener()
+            if opener:
+                return opener
+        if len(self.pool) == 0:
+            return self.table.answers[self.candidates[0]]
+
+        scores = self.scores()
+        possible = np.isin(self._answer_of[self.pool], self.candidates)
+        best = self.table.guesses[self.pool[np.argmax(scores + 1e-6 * possible)]]
+        if not self.history:
+            self._cache_opener(best)
+        return best
+
+    # ---- opener cache ----
+
+    def _opener_path(self):
+        if not self.cache_dir:
+            return None
+        t = self.table
+        key = hashlib.sha1(("\n".join(t.guesses) + "|" + "\n".join(t.answers)
+                            + f"|{self.hard_mode}|{self.answers_only}").encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"opener-{key}.json")
+
+    def _cached_opener(self):
+        path = self._opener_path()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)["opener"]
+        return None
+
+    def _cache_opener(self, word):
+        path = self._opener_path()
+        if path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = path + f".{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"opener": word}, f)
+            os.replace(tmp, path)
+
+
+def solve(table, secret, max_guesses=6, strategy=Solver, **options):
+    """Let `strategy(table, **options)` play against `secret`; returns the list of guesses
+    (the last one is right if solved). A strategy needs suggest() and update(guess, code)."""
+    solver = strategy(table, **options)
+    guesses = []
+    while len(guesses) < max_guesses:
+        guess = solver.suggest()
+        guesses.append(guess)
+        code = feedback(table, guess, secret)
+        if code == GREEN_ALL:
+            break
+        solver.update(guess, code)
+    return guesses
+
+
+def _benchmark():
+    import time
+
+    from Wordle import WORDS
+
+    words = sorted(set(WORDS))
+    table = FeedbackMatrix.build(words)
+    for options in ({}, {"hard_mode": True}, {"answers_only": True}):
+        results = [solve(table, secret, cache_dir=None, **options) for secret in words]
+        solved = [g for g, s in zip(results, words) if g[-1] == s]
+        print(f"{str(options) or 'default':>24}: {len(solved)}/{len(words)} solved, "
+              f"{sum(map(len, solved)) / len(solved):.2f} guesses on average")
+
+    # several boards at once: one suggestion and one feedback lookup per turn for all boards
+    rng = np.random.default_rng(2)
+    for boards in (4, 8, 32):
+        targets = rng.choice(len(words), boards, replace=False)
+        solvers = [Solver(table, cache_dir=None) for _ in targets]
+        solved = np.zeros(boards, dtype=bool)
+        turns, slowest = 0, 0.0
+        while not solved.all() and turns < boards + 5:
+            start = time.perf_counter()
+            guess = suggest_boards([s for s, done in zip(solvers, solved) if not done])
+            codes = row(table, guess)[targets]
+            solved |= codes == GREEN_ALL
+            for b in np.flatnonzero(~solved):
+                solvers[b].update(guess, int(codes[b]))
+            slowest = max(slowest, time.perf_counter() - start)
+            turns += 1
+        print(f"{boards} boards: {int(solved.sum())} solved in {turns}/{boards + 5} turns, "
+              f"slowest turn {slowest * 1000:.1f} ms")
+
+    # interactive latency on a 13k-guess list (random letters stand in for a real list)
+    fake = sorted({"".join(chr(97 + c) for c in row) for row in rng.integers(0, 26, (13000, 5))})
+    guesses = sorted(set(fake) | set(words))
+    big = FeedbackMatrix.build(guesses, words)
+    solver = Solver(big, cache_dir=None)
+    for step in range(3):
+        start = time.perf_counter()
+        guess = solver.suggest()
+        elapsed = time.perf_counter() - start
+        print(f"{len(guesses)} guesses x {len(solver.candidates)} candidates: {guess} in {elapsed * 1000:.1f} ms")
+        solver.update(guess, int(solver.row(guess)[big.answer_index["crane"]]))
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,195 @@
+"""Weighted random sampling shared by the projects in this repository.
+
+Three paths, for three kinds of callers:
+
+- AliasTable: Walker/Vose alias method for fixed distributions (slot symbols,
+  chest rarities). O(k) to build once, then O(1) per draw.
+- weighted_choice: cumulative sum + bisect for weights that change on every
+  call (NPC goal weights). Same semantics as the old per-project helpers.
+- AliasTable.sample_indices / sample_many: draw many outcomes at once,
+  vectorized with NumPy when it is installed.
+
+Run this file to check every path against the distributions it replaces.
+"""
+import bisect
+import itertools
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, batched draws fall back to plain Python
+    np = None
+
+
+class AliasTable:
+    def __init__(self, items, weights):
+        items = list(items)
+        weights = [float(w) for w in weights]
+        total = sum(weights)
+        if not items or len(items) != len(weights) or total <= 0 or min(weights) < 0:
+            raise ValueError("AliasTable needs matching items and non-negative weights with a positive sum")
+
+        n = len(items)
+        self.items = items
+        self.probabilities = [w / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+
+        # Vose: split scaled weights into under- and over-full columns and pair them up
+        scaled = [p * n for p in self.probabilities]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:   # leftovers are full columns (up to rounding)
+            self.prob[i] = 1.0
+
+        self._np_prob = self._np_alias = None
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """From [(item, weight), ...], e.g. SLOT_SYMBOLS."""
+        return cls([item for item, _ in pairs], [weight for _, weight in pairs])
+
+    @classmethod
+    def from_dict(cls, weights):
+        return cls(weights.keys(), weights.values())
+
+    def __len__(self):
+        return len(self.items)
+
+    def sample(self, rng=random):
+        u = rng.random() * len(self.prob)
+        i = int(u)
+        return self.items[i] if u - i < self.prob[i] else self.items[self.alias[i]]
+
+    def sample_indices(self, count, rng=None):
+        """`count` draws as item indices (a NumPy array when NumPy is available)."""
+        if np is None:
+            rng = rng or random
+            n, prob, alias = len(self.prob), self.prob, self.alias
+            out = []
+            for _ in range(count):
+                u = rng.random() * n
+                i = int(u)
+                out.append(i if u - i < prob[i] else alias[i])
+            return out
+
+        if self._np_prob is None:
+            self._np_prob = np.array(self.prob)
+            self._np_alias = np.array(self.alias)
+        rng = rng or np.random.default_rng()
+        u = rng.random(count) * len(self.prob)
+        i = u.astype(np.intp)
+        return np.where(u - i < self._np_prob[i], i, self._np_alias[i])
+
+    def sample_many(self, count, rng=None):
+        items = self.items
+        return [items[i] for i in self.sample_indices(count, rng)]
+
+
+def weighted_choice(choices: dict):
+    """One draw from {choice: weight} with weights that change between calls."""
+    keys = list(choices)
+    cum_weights = list(itertools.accumulate(choices.values()))
+    total = cum_weights[-1] if cum_weights else 0
+    if total <= 0:
+        # like the original helpers: the first choice wins when nothing has weight
+        return keys[0] if keys else None
+    return keys[bisect.bisect_right(cum_weights, random.random() * total)]
+
+
+# ---- statistical self-check ----
+
+def _chi_square(counts, probabilities):
+    total = sum(counts)
+    return sum((c - p * total) ** 2 / (p * total) for c, p in zip(counts, probabilities) if p > 0)
+
+
+def _chi_square_critical(dof, z=3.09):
+    """Upper critical value for p = 0.001 (Wilson-Hilferty approximation)."""
+    return dof * (1 - 2 / (9 * dof) + z * math.sqrt(2 / (9 * dof))) ** 3
+
+
+def _check(label, items, probabilities, draws):
+    counts = [0] * len(items)
+    position = {item: i for i, item in enumerate(items)}
+    for d in draws:
+        counts[position[d]] += 1
+    dof = sum(1 for p in probabilities if p > 0) - 1
+    stat = _chi_square(counts, probabilities)
+    limit = _chi_square_critical(max(1, dof))
+    ok = stat < limit and all(c == 0 for c, p in zip(counts, probabilities) if p == 0)
+    print(f"{'ok  ' if ok else 'FAIL'} {label}: chi2 = {stat:.1f} (limit {limit:.1f}, {len(draws)} draws)")
+    return ok
+
+
+def _legacy_chest_probabilities(legendary_chance, epic=15, rare=30):
+    """Rarity odds of the original randint(1, 100) threshold chain in open_chest."""
+    counts = dict.fromkeys(("LEGENDARY", "EPIC", "RARE", "COMMON"), 0)
+    for roll in range(1, 101):
+        if roll <= legendary_chance:
+            counts["LEGENDARY"] += 1
+        elif roll <= legendary_chance + epic:
+            counts["EPIC"] += 1
+        elif roll <= legendary_chance + epic + rare:
+            counts["RARE"] += 1
+        else:
+            counts["COMMON"] += 1
+    return counts
+
+
+def self_test(draws=200000, seed=7):
+    import os
+    import sys
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.join(root, "Games", "CureForMyBoredom"))
+    import Mini_Games
+
+    random.seed(seed)
+    rng = np.random.default_rng(seed) if np else None
+    results = []
+
+    # slot machine symbols
+    table = Mini_Games.SLOT_TABLE
+    total = sum(w for _, w in Mini_Games.SLOT_SYMBOLS)
+    expected = [w / total for _, w in Mini_Games.SLOT_SYMBOLS]
+    results.append(_check("alias, single draws (slots)", table.items, expected,
+                          [table.sample() for _ in range(draws)]))
+    results.append(_check("alias, batched draws (slots)", table.items, expected, table.sample_many(draws, rng)))
+
+    # chest rarities at several boost levels, including boosts that squeeze out common/rare
+    for boost in (0, 10, 60, 100):
+        chance = Mini_Games.LEGENDARY_BASE_CHANCE + boost
+        legacy = _legacy_chest_probabilities(chance, Mini_Games.EPIC_CHANCE, Mini_Games.RARE_CHANCE)
+        table = Mini_Games.chest_rarity_table(chance)
+        expected = [legacy[item] / 100 for item in table.items]
+        results.append(_check(f"alias, chest rarities (+{boost}% boost)", table.items, expected,
+                              [table.sample() for _ in range(draws // 4)]))
+        results.append(_check(f"alias, batched chest rarities (+{boost}% boost)", table.items, expected,
+                              table.sample_many(draws // 4, rng)))
+
+    # per-call weights, including a zero weight (NPC goal weights)
+    goals = {"rest": 3.0, "work": 0.0, "explore": 2.5, "socialize": 1.2, "trade": 0.4, "guild": 0.1}
+    total = sum(goals.values())
+    results.append(_check("cumulative sum (goal weights)", list(goals),
+                          [w / total for w in goals.values()],
+                          [weighted_choice(goals) for _ in range(draws)]))
+
+    # degenerate inputs
+    one = AliasTable(["only"], [5])
+    results.append(all(one.sample() == "only" for _ in range(100)))
+    results.append(weighted_choice({"a": 0, "b": 0}) == "a")
+
+    print("all checks passed" if all(results) else "SOME CHECKS FAILED")
+    return all(results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if self_test() else 1)